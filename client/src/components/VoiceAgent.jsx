@@ -2,7 +2,8 @@ import { useState, useEffect, useRef, useCallback } from 'react';
 import { useWebRTC } from '../hooks/useWebRTC';
 import CostDisplay from './CostDisplay';
 
-const WS_URL = 'ws://localhost:3001/ws';
+// Request binary audio frames; the server confirms in connection.established
+const WS_URL = 'ws://localhost:3001/ws?audio=binary';
 
 function VoiceAgent({ systemPrompt, voice = 'alloy' }) {
   const [isConnected, setIsConnected] = useState(false);
@@ -21,6 +22,7 @@ function VoiceAgent({ systemPrompt, voice = 'alloy' }) {
   const sessionStartedRef = useRef(false);
   const conversationEndRef = useRef(null);
   const openaiConnectedRef = useRef(false);
+  const binaryAudioRef = useRef(false);
 
   const {
     isRecording,
@@ -34,11 +36,16 @@ function VoiceAgent({ systemPrompt, voice = 'alloy' }) {
   /**
    * Handle audio data from microphone
    */
-  const handleAudioData = useCallback((base64Audio) => {
+  const handleAudioData = useCallback((audio) => {
     if (wsRef.current && wsRef.current.readyState === WebSocket.OPEN) {
+      if (audio instanceof ArrayBuffer) {
+        // Binary mode: raw PCM16 frame, no JSON envelope
+        wsRef.current.send(audio);
+        return;
+      }
       wsRef.current.send(JSON.stringify({
         type: 'input_audio_buffer.append',
-        audio: base64Audio,
+        audio: audio,
       }));
     }
   }, []);
@@ -53,6 +60,7 @@ function VoiceAgent({ systemPrompt, voice = 'alloy' }) {
 
     setConnectionStatus('connecting');
     const ws = new WebSocket(WS_URL);
+    ws.binaryType = 'arraybuffer';
     wsRef.current = ws;
 
     ws.onopen = () => {
@@ -61,9 +69,15 @@ function VoiceAgent({ systemPrompt, voice = 'alloy' }) {
       setConnectionStatus('connected');
       sessionStartedRef.current = false;
       openaiConnectedRef.current = false; // Reset on new connection
+      binaryAudioRef.current = false;
     };
 
     ws.onmessage = (event) => {
+      if (event.data instanceof ArrayBuffer) {
+        // Binary frames carry raw PCM16 output audio
+        handleServerMessage({ type: 'response.audio.delta', delta: event.data });
+        return;
+      }
       try {
         const message = JSON.parse(event.data);
         handleServerMessage(message);
@@ -95,6 +109,7 @@ function VoiceAgent({ systemPrompt, voice = 'alloy' }) {
       case 'connection.established':
         console.log('Connected to OpenAI API');
         openaiConnectedRef.current = true;
+        binaryAudioRef.current = message.audio_mode === 'binary';
         break;
 
       case 'session.created':
@@ -105,6 +120,8 @@ function VoiceAgent({ systemPrompt, voice = 'alloy' }) {
 
       case 'input_audio_buffer.speech_started':
         console.log('User started speaking');
+        // Stop agent audio already scheduled locally; the server drops the rest
+        clearAudioQueue();
         setAgentStatus('listening');
         setCurrentTranscript('🎤 Listening to you...');
         break;
@@ -165,6 +182,13 @@ function VoiceAgent({ systemPrompt, voice = 'alloy' }) {
         setCurrentTranscript('');
         break;
 
+      case 'heartbeat':
+        // Answer server heartbeats so idle sessions are not reaped
+        if (wsRef.current && wsRef.current.readyState === WebSocket.OPEN) {
+          wsRef.current.send(JSON.stringify({ type: 'heartbeat' }));
+        }
+        break;
+
       case 'cost.update':
         if (message.cost) {
           setConversationCost(message.cost);
@@ -176,7 +200,7 @@ function VoiceAgent({ systemPrompt, voice = 'alloy' }) {
         setConnectionStatus('error');
         break;
     }
-  }, [playAudio]);
+  }, [playAudio, clearAudioQueue]);
 
   /**
    * Handle conversation items from OpenAI
@@ -293,7 +317,7 @@ function VoiceAgent({ systemPrompt, voice = 'alloy' }) {
     }));
 
     // Start recording
-    await startRecording(handleAudioData);
+    await startRecording(handleAudioData, { binary: binaryAudioRef.current });
     setAgentStatus('listening');
   };
 
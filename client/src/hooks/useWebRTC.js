@@ -20,8 +20,9 @@ export function useWebRTC() {
 
   /**
    * Initialize audio context and request microphone access
+   * In binary mode onAudioData receives raw PCM16 ArrayBuffers instead of base64
    */
-  const startRecording = useCallback(async (onAudioData) => {
+  const startRecording = useCallback(async (onAudioData, { binary = false } = {}) => {
     try {
       setError(null);
 
@@ -62,9 +63,8 @@ export function useWebRTC() {
           // Convert Float32Array to Int16Array (PCM16)
           const pcm16 = float32ToPCM16(inputData);
           
-          // Send as base64
-          const base64Audio = arrayBufferToBase64(pcm16.buffer);
-          onAudioData(base64Audio);
+          // Send raw in binary mode, otherwise as base64
+          onAudioData(binary ? pcm16.buffer : arrayBufferToBase64(pcm16.buffer));
         };
 
         // Connect audio nodes
@@ -87,9 +87,8 @@ export function useWebRTC() {
           // Convert Float32Array to Int16Array (PCM16)
           const pcm16 = float32ToPCM16(inputData);
           
-          // Send as base64
-          const base64Audio = arrayBufferToBase64(pcm16.buffer);
-          onAudioData(base64Audio);
+          // Send raw in binary mode, otherwise as base64
+          onAudioData(binary ? pcm16.buffer : arrayBufferToBase64(pcm16.buffer));
         };
 
         // Connect audio nodes
@@ -148,15 +147,21 @@ export function useWebRTC() {
   }, []);
 
   /**
-   * Play audio response from base64 PCM16 data
+   * Play audio response from base64 PCM16 data or a raw PCM16 ArrayBuffer
    */
-  const playAudio = useCallback(async (base64Audio) => {
+  const playAudio = useCallback(async (audio) => {
     try {
-      // Decode base64 to ArrayBuffer
-      const binaryString = atob(base64Audio);
-      const bytes = new Uint8Array(binaryString.length);
-      for (let i = 0; i < binaryString.length; i++) {
-        bytes[i] = binaryString.charCodeAt(i);
+      let bytes;
+      if (audio instanceof ArrayBuffer) {
+        // Binary mode frames are already raw PCM16
+        bytes = new Uint8Array(audio);
+      } else {
+        // Decode base64 to ArrayBuffer
+        const binaryString = atob(audio);
+        bytes = new Uint8Array(binaryString.length);
+        for (let i = 0; i < binaryString.length; i++) {
+          bytes[i] = binaryString.charCodeAt(i);
+        }
       }
       
       // Initialize playback context if needed
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+
+"""
+Load test for the relay against the local mock Realtime server
+
+Starts the mock upstream and a relay process pointed at it through
+OPENAI_REALTIME_URL, then drives N synthetic browser clients through /ws,
+each sending 4096-sample PCM16 append frames at real-time rate. Reports
+throughput, p50/p99 relay latency of output audio, and relay CPU and RSS
+per session.
+
+Usage (from the server directory):
+    python -m bench.load_test --sessions 50 --duration 30
+    python -m bench.load_test --sessions 50 --binary
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List
+
+import websockets
+
+from bench.mock_realtime import read_timestamp
+from models.audio import SAMPLE_RATE, BYTES_PER_SAMPLE
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Matches the browser AudioWorklet chunk size
+CHUNK_SAMPLES = 4096
+
+
+@dataclass
+class ClientResult:
+    messages: int = 0
+    bytes: int = 0
+    audio_frames: int = 0
+    latencies_ms: List[float] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+@dataclass
+class ProcessSample:
+    cpu_seconds: float
+    rss_bytes: int
+
+
+def sample_process(pid: int) -> Optional[ProcessSample]:
+    """Read CPU time and RSS of a process from /proc (Linux only)"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except OSError:
+        return None
+    ticks = os.sysconf("SC_CLK_TCK")
+    cpu_seconds = (int(fields[11]) + int(fields[12])) / ticks
+    return ProcessSample(cpu_seconds, resident_pages * os.sysconf("SC_PAGE_SIZE"))
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def start_process(args: List[str], env: Dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, *args],
+        cwd=SERVER_DIR,
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+
+def wait_for_http(url: str, timeout: float = 15.0):
+    """Poll an HTTP endpoint until it answers"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Timed out waiting for {url}")
+
+
+async def run_client(url: str, binary: bool, duration: float, result: ClientResult):
+    """Simulate one browser session for the given duration"""
+    chunk = bytes(CHUNK_SAMPLES * BYTES_PER_SAMPLE)
+    chunk_seconds = CHUNK_SAMPLES / SAMPLE_RATE
+    append = json.dumps({
+        "type": "input_audio_buffer.append",
+        "audio": base64.b64encode(chunk).decode("ascii")
+    })
+
+    async def receive(websocket):
+        async for message in websocket:
+            received_at = time.time_ns()
+            result.messages += 1
+            result.bytes += len(message)
+            if isinstance(message, bytes):
+                pcm = message
+            elif message.startswith('{"type":"response.audio.delta"'):
+                pcm = base64.b64decode(json.loads(message)["delta"])
+            else:
+                continue
+            result.audio_frames += 1
+            sent_at = read_timestamp(pcm)
+            if sent_at:
+                result.latencies_ms.append((received_at - sent_at) / 1e6)
+
+    try:
+        async with websockets.connect(url, max_size=None) as websocket:
+            established = json.loads(await websocket.recv())
+            if established.get("type") != "connection.established":
+                raise RuntimeError(f"Unexpected first message: {established.get('type')}")
+
+            await websocket.send(json.dumps({
+                "type": "session.update",
+                "session": {"instructions": "Benchmark session", "input_audio_format": "pcm16"}
+            }))
+            receiver = asyncio.create_task(receive(websocket))
+
+            # Send audio at real-time rate, correcting for drift
+            started_at = time.monotonic()
+            sent = 0
+            while time.monotonic() - started_at < duration:
+                await websocket.send(chunk if binary else append)
+                sent += 1
+                delay = started_at + sent * chunk_seconds - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            receiver.cancel()
+    except Exception as e:
+        result.error = str(e)
+
+
+async def run_clients(url: str, sessions: int, binary: bool, duration: float, ramp: float) -> List[ClientResult]:
+    results = [ClientResult() for _ in range(sessions)]
+    tasks = []
+    for result in results:
+        tasks.append(asyncio.create_task(run_client(url, binary, duration, result)))
+        await asyncio.sleep(ramp / max(sessions, 1))
+    await asyncio.gather(*tasks)
+    return results
+
+
+def report(results: List[ClientResult], elapsed: float, before: Optional[ProcessSample], after: Optional[ProcessSample]) -> Dict[str, Any]:
+    latencies = [latency for result in results for latency in result.latencies_ms]
+    ok = [result for result in results if result.error is None]
+    summary = {
+        "sessions": len(results),
+        "failedSessions": len(results) - len(ok),
+        "elapsedSeconds": round(elapsed, 2),
+        "messagesPerSecond": round(sum(r.messages for r in results) / elapsed, 1),
+        "bytesPerSecond": round(sum(r.bytes for r in results) / elapsed),
+        "audioFrames": sum(r.audio_frames for r in results),
+        "latencyP50Ms": round(percentile(latencies, 0.50), 2),
+        "latencyP99Ms": round(percentile(latencies, 0.99), 2),
+    }
+    if before and after and results:
+        summary["relayCpuSecondsPerSession"] = round((after.cpu_seconds - before.cpu_seconds) / len(results), 4)
+        summary["relayCpuPercent"] = round((after.cpu_seconds - before.cpu_seconds) / elapsed * 100, 1)
+        summary["relayRssMb"] = round(after.rss_bytes / 2**20, 1)
+        summary["relayRssKbPerSession"] = round((after.rss_bytes - before.rss_bytes) / 1024 / len(results), 1)
+    errors = sorted({result.error for result in results if result.error})
+    if errors:
+        summary["errors"] = errors[:5]
+    return summary
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Relay load test against a mock Realtime server")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds of audio each client sends")
+    parser.add_argument("--ramp", type=float, default=2.0, help="Seconds over which clients connect")
+    parser.add_argument("--binary", action="store_true", help="Use the binary audio mode on /ws")
+    parser.add_argument("--relay-port", type=int, default=3101)
+    parser.add_argument("--mock-port", type=int, default=9100)
+    parser.add_argument("--relay-url", help="Benchmark an already running relay instead of starting one")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    processes = []
+    relay_pid = None
+
+    try:
+        if args.relay_url:
+            ws_url = args.relay_url
+        else:
+            processes.append(start_process(["-m", "bench.mock_realtime", "--port", str(args.mock_port)], {}))
+            # Keep benchmark sessions and spend out of the real stores
+            state_dir = tempfile.mkdtemp()
+            relay = start_process(
+                ["-m", "uvicorn", "main:app", "--port", str(args.relay_port), "--log-level", "warning"],
+                {
+                    "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "bench"),
+                    "OPENAI_REALTIME_URL": f"ws://127.0.0.1:{args.mock_port}",
+                    "SESSION_STORE_PATH": os.path.join(state_dir, "bench-sessions.db"),
+                    "COST_LEDGER_PATH": os.path.join(state_dir, "bench-ledger.db"),
+                }
+            )
+            processes.append(relay)
+            relay_pid = relay.pid
+            wait_for_http(f"http://127.0.0.1:{args.relay_port}/health")
+            ws_url = f"ws://127.0.0.1:{args.relay_port}/ws"
+
+        if args.binary:
+            ws_url += "?audio=binary"
+
+        before = sample_process(relay_pid) if relay_pid else None
+        started_at = time.monotonic()
+        results = asyncio.run(run_clients(ws_url, args.sessions, args.binary, args.duration, args.ramp))
+        elapsed = time.monotonic() - started_at
+        after = sample_process(relay_pid) if relay_pid else None
+
+        summary = report(results, elapsed, before, after)
+        if args.json:
+            print(json.dumps(summary, indent=2))
+        else:
+            for key, value in summary.items():
+                print(f"{key:>28}: {value}")
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
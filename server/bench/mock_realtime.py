@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+
+"""
+Local mock of the OpenAI Realtime WebSocket API for benchmarking the relay
+
+Emits session.created on connect, then for every TURN_MS of appended input
+audio plays back a response: speech_stopped, response.created, a stream of
+response.audio.delta frames and a response.done carrying usage. The first
+8 bytes of every audio delta hold the send time (time.time_ns) so clients
+can measure relay latency in both JSON and binary audio modes.
+
+Usage:
+    python -m bench.mock_realtime --port 9100
+"""
+
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import logging
+import struct
+import time
+from typing import Optional, Dict, Any
+
+import websockets
+
+from models.audio import BYTES_PER_MS
+
+logger = logging.getLogger(__name__)
+
+TIMESTAMP = struct.Struct("<q")
+
+_ids = itertools.count(1)
+
+
+def _next_id(prefix: str) -> str:
+    return f"{prefix}_{next(_ids)}"
+
+
+def read_timestamp(pcm: bytes) -> Optional[int]:
+    """Read the send time embedded in a mock audio delta"""
+    if len(pcm) < TIMESTAMP.size:
+        return None
+    return TIMESTAMP.unpack_from(pcm)[0]
+
+
+class MockRealtimeSession:
+    """One simulated Realtime session"""
+
+    def __init__(self, websocket, turn_ms: int, response_ms: int, chunk_ms: int, speed: float):
+        self.websocket = websocket
+        self.turn_ms = turn_ms
+        self.response_ms = response_ms
+        self.chunk_ms = chunk_ms
+        self.speed = speed
+        self.buffered_ms = 0.0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.response_task: Optional[asyncio.Task] = None
+
+    async def send_event(self, event: Dict[str, Any]):
+        event.setdefault("event_id", _next_id("event"))
+        await self.websocket.send(json.dumps(event, separators=(",", ":")))
+
+    async def run(self):
+        await self.send_event({
+            "type": "session.created",
+            "session": {"id": _next_id("sess"), "model": "gpt-realtime-mock"}
+        })
+        try:
+            async for message in self.websocket:
+                event = json.loads(message)
+                await self.handle_event(event)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            if self.response_task:
+                self.response_task.cancel()
+
+    async def handle_event(self, event: Dict[str, Any]):
+        event_type = event.get("type")
+        if event_type == "session.update":
+            await self.send_event({"type": "session.updated", "session": event.get("session", {})})
+        elif event_type == "input_audio_buffer.append":
+            self.buffered_ms += len(event.get("audio", "")) * 3 / 4 / BYTES_PER_MS
+            if self.buffered_ms >= self.turn_ms and not self.responding:
+                self.buffered_ms = 0.0
+                self.response_task = asyncio.create_task(self.respond(from_speech=True))
+        elif event_type == "response.create" and not self.responding:
+            self.response_task = asyncio.create_task(self.respond(from_speech=False))
+        elif event_type == "response.cancel" and self.responding:
+            self.response_task.cancel()
+
+    @property
+    def responding(self) -> bool:
+        return self.response_task is not None and not self.response_task.done()
+
+    async def respond(self, from_speech: bool):
+        """Stream one response at the configured multiple of real time"""
+        response_id = _next_id("resp")
+        item_id = _next_id("item")
+        if from_speech:
+            await self.send_event({"type": "input_audio_buffer.speech_stopped", "audio_end_ms": self.turn_ms})
+            await self.send_event({"type": "input_audio_buffer.committed", "item_id": _next_id("item")})
+        await self.send_event({"type": "response.created", "response": {"id": response_id, "status": "in_progress"}})
+
+        chunk_bytes = self.chunk_ms * BYTES_PER_MS
+        for _ in range(max(self.response_ms // self.chunk_ms, 1)):
+            pcm = TIMESTAMP.pack(time.time_ns()) + bytes(chunk_bytes - TIMESTAMP.size)
+            await self.send_event({
+                "type": "response.audio.delta",
+                "response_id": response_id,
+                "item_id": item_id,
+                "output_index": 0,
+                "content_index": 0,
+                "delta": base64.b64encode(pcm).decode("ascii")
+            })
+            await self.send_event({
+                "type": "response.audio_transcript.delta",
+                "response_id": response_id,
+                "item_id": item_id,
+                "output_index": 0,
+                "content_index": 0,
+                "delta": "lorem "
+            })
+            await asyncio.sleep(self.chunk_ms / 1000 / self.speed)
+
+        self.input_tokens += self.turn_ms // 100 + 20
+        self.output_tokens += self.response_ms // 50
+        await self.send_event({"type": "response.audio.done", "response_id": response_id, "item_id": item_id})
+        await self.send_event({
+            "type": "response.done",
+            "response": {
+                "id": response_id,
+                "status": "completed",
+                "usage": {
+                    "total_tokens": self.input_tokens + self.output_tokens,
+                    "input_tokens": self.input_tokens,
+                    "output_tokens": self.output_tokens,
+                    "input_token_details": {"cached_tokens": 0},
+                    "output_token_details": {}
+                }
+            }
+        })
+
+
+async def serve(host: str, port: int, turn_ms: int, response_ms: int, chunk_ms: int, speed: float):
+    """Run the mock server until cancelled"""
+    async def handler(websocket, path=None):
+        await MockRealtimeSession(websocket, turn_ms, response_ms, chunk_ms, speed).run()
+
+    async with websockets.serve(handler, host, port, max_size=None):
+        logger.info(f"Mock Realtime API listening on ws://{host}:{port}")
+        await asyncio.Future()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Mock OpenAI Realtime API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--turn-ms", type=int, default=3000, help="Input audio per simulated user turn")
+    parser.add_argument("--response-ms", type=int, default=4000, help="Output audio per response")
+    parser.add_argument("--chunk-ms", type=int, default=100, help="Output audio per delta frame")
+    parser.add_argument("--speed", type=float, default=4.0, help="Output audio rate as a multiple of real time")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.turn_ms, args.response_ms, args.chunk_ms, args.speed))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+
+"""
+Replay a recorded session trace through the relay
+
+Reads a trace written with TRACE_ENABLED=true, serves its upstream frames
+from a local stand-in for the Realtime API and plays its client frames
+into /ws of a relay pointed at that stand-in, both on the recorded
+timeline (optionally accelerated). Reports relay latency per event type,
+measured from the stand-in sending a frame to the client receiving the
+matching one, plus relay CPU and RSS. Events are matched by event_id;
+audio deltas, which the relay may re-frame or drop on barge-in, are
+matched in order within their response and item, and audio of earlier
+items that never arrived is counted as lost rather than timed.
+
+Usage (from the server directory):
+    python -m bench.replay_trace traces/<session>.jsonl.gz
+    python -m bench.replay_trace traces/<session>.jsonl.gz --speed 4 --repeat 10
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import tempfile
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Tuple, Deque, Union
+
+import websockets
+
+from bench.load_test import start_process, wait_for_http, sample_process, percentile
+from services.trace_recorder import read_trace, CLIENT, UPSTREAM
+
+# In binary audio mode output audio reaches the client as bare PCM frames
+_BINARY_AUDIO_TYPE = "response.audio.delta"
+
+# (offset in seconds, frame)
+Frame = Tuple[float, Union[str, bytes]]
+
+
+@dataclass(frozen=True)
+class FrameId:
+    """What identifies an upstream frame when it reaches the client"""
+    event_type: str
+    event_id: Optional[str] = None
+    response_id: Optional[str] = None
+    item_id: Optional[str] = None
+
+
+def frame_id(frame: Union[str, bytes]) -> FrameId:
+    if isinstance(frame, bytes):
+        return FrameId(_BINARY_AUDIO_TYPE)
+    try:
+        event = json.loads(frame)
+    except ValueError:
+        return FrameId("unknown")
+    response = event.get("response")
+    return FrameId(
+        event.get("type") or "unknown",
+        event.get("event_id"),
+        event.get("response_id") or (response.get("id") if isinstance(response, dict) else None),
+        event.get("item_id")
+    )
+
+
+@dataclass
+class Trace:
+    header: Dict[str, Any]
+    client_frames: List[Frame]
+    upstream_frames: List[Frame]
+    upstream_ids: List[FrameId] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        offsets = [offset for offset, _ in self.client_frames + self.upstream_frames]
+        return max(offsets) - self.origin if offsets else 0.0
+
+    @property
+    def origin(self) -> float:
+        """Offset of the first upstream frame, which the relay receives on connect"""
+        return self.upstream_frames[0][0] if self.upstream_frames else 0.0
+
+
+@dataclass
+class ReplayResult:
+    sent: int = 0
+    received: int = 0
+    latencies_ms: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    # Frames the client received that match nothing the stand-in sent, per event type
+    unmatched: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    # Upstream frames that never reached the client, per event type
+    lost: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    error: Optional[str] = None
+
+
+def load_trace(path: str) -> Trace:
+    records = read_trace(path)
+    header = next(records)
+    client_frames, upstream_frames = [], []
+    for record in records:
+        frame = base64.b64decode(record["bytes"]) if "bytes" in record else record["text"]
+        if record["dir"] == CLIENT:
+            client_frames.append((record["t"], frame))
+        elif record["dir"] == UPSTREAM:
+            upstream_frames.append((record["t"], frame))
+    return Trace(header, client_frames, upstream_frames, [frame_id(frame) for _, frame in upstream_frames])
+
+
+def client_url(base_url: str, header: Dict[str, Any]) -> str:
+    """Rebuild the recorded client leg's query string"""
+    params = []
+    if header.get("audioMode") == "binary":
+        params.append("audio=binary")
+    if header.get("codec") and header.get("codec") != "pcm16":
+        params.append(f"codec={header['codec']}")
+    if header.get("sampleRate"):
+        params.append(f"rate={header['sampleRate']}")
+    return base_url + ("?" + "&".join(params) if params else "")
+
+
+class Replay:
+    """One replay of a trace: the stand-in upstream plus the scripted client"""
+
+    def __init__(self, trace: Trace, speed: float):
+        self.trace = trace
+        self.speed = speed
+        self.started_at: Optional[float] = None
+        self.connected = asyncio.Event()
+        self.done = asyncio.Event()
+        self.result = ReplayResult()
+        # Upstream frames not yet seen by the client: events by event_id,
+        # audio deltas in send order
+        self._in_flight: Dict[str, Tuple[str, float]] = {}
+        self._audio_in_flight: Deque[Tuple[FrameId, float]] = deque()
+        # Latest response the client heard of, which bare binary audio belongs to
+        self._response_id: Optional[str] = None
+
+    def _delay(self, offset: float) -> float:
+        return self.started_at + (offset - self.trace.origin) / self.speed - time.monotonic()
+
+    async def serve_upstream(self, websocket):
+        """Stand-in for the Realtime API: play the recorded upstream frames"""
+        if self.started_at is not None:
+            # Reconnects during the recording are not replayed
+            await websocket.close()
+            return
+        self.started_at = time.monotonic()
+        self.connected.set()
+        drain = asyncio.create_task(self._ignore(websocket))
+        try:
+            for (offset, frame), identity in zip(self.trace.upstream_frames, self.trace.upstream_ids):
+                delay = self._delay(offset)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                sent_at = time.perf_counter()
+                if identity.event_type == _BINARY_AUDIO_TYPE:
+                    self._audio_in_flight.append((identity, sent_at))
+                elif identity.event_id:
+                    self._in_flight[identity.event_id] = (identity.event_type, sent_at)
+                await websocket.send(frame)
+            await self.done.wait()
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            drain.cancel()
+
+    @staticmethod
+    async def _ignore(websocket):
+        async for _ in websocket:
+            pass
+
+    async def run_client(self, url: str, tail: float):
+        """Send the recorded client frames and time what comes back"""
+        try:
+            async with websockets.connect(url, max_size=None) as websocket:
+                established = json.loads(await websocket.recv())
+                if established.get("type") != "connection.established":
+                    raise RuntimeError(f"Unexpected first message: {established.get('type')}")
+                await asyncio.wait_for(self.connected.wait(), 10)
+                receiver = asyncio.create_task(self._receive(websocket))
+
+                for offset, frame in self.trace.client_frames:
+                    delay = self._delay(offset)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    await websocket.send(frame)
+                    self.result.sent += 1
+
+                # Let the rest of the upstream timeline play out
+                remaining = self._delay(self.trace.origin + self.trace.duration)
+                await asyncio.sleep(max(remaining, 0) + tail)
+                receiver.cancel()
+        except Exception as e:
+            self.result.error = str(e)
+        finally:
+            for event_type, _ in self._in_flight.values():
+                self.result.lost[event_type] += 1
+            self.result.lost[_BINARY_AUDIO_TYPE] += len(self._audio_in_flight)
+            self.done.set()
+
+    async def _receive(self, websocket):
+        async for message in websocket:
+            received_at = time.perf_counter()
+            self.result.received += 1
+            identity = frame_id(message)
+            if identity.event_type == _BINARY_AUDIO_TYPE:
+                sent_at = self._match_audio(identity)
+            else:
+                if identity.response_id:
+                    self._response_id = identity.response_id
+                sent = self._in_flight.pop(identity.event_id, None) if identity.event_id else None
+                sent_at = sent[1] if sent else None
+            if sent_at is None:
+                self.result.unmatched[identity.event_type] += 1
+            else:
+                self.result.latencies_ms[identity.event_type].append((received_at - sent_at) * 1000)
+
+    def _match_audio(self, identity: FrameId) -> Optional[float]:
+        """Send time of the oldest pending delta of the same response and item
+
+        Pending deltas ahead of it were dropped by the relay, e.g. on barge-in.
+        """
+        response_id = identity.response_id or self._response_id
+        for index, (pending, _) in enumerate(self._audio_in_flight):
+            if pending.response_id == response_id and (identity.item_id is None or pending.item_id == identity.item_id):
+                break
+        else:
+            return None
+        for _ in range(index):
+            self._audio_in_flight.popleft()
+            self.result.lost[_BINARY_AUDIO_TYPE] += 1
+        return self._audio_in_flight.popleft()[1]
+
+
+async def replay(trace: Trace, relay_url: str, upstream_port: int, speed: float, repeat: int, tail: float) -> List[ReplayResult]:
+    results = []
+    for _ in range(repeat):
+        session = Replay(trace, speed)
+        async with websockets.serve(session.serve_upstream, "127.0.0.1", upstream_port, max_size=None):
+            await session.run_client(client_url(relay_url, trace.header), tail)
+        results.append(session.result)
+    return results
+
+
+def report(trace: Trace, results: List[ReplayResult], elapsed: float, before, after) -> Dict[str, Any]:
+    by_type: Dict[str, List[float]] = defaultdict(list)
+    for result in results:
+        for event_type, latencies in result.latencies_ms.items():
+            by_type[event_type].extend(latencies)
+    everything = [latency for latencies in by_type.values() for latency in latencies]
+    summary = {
+        "traceSessionId": trace.header.get("sessionId"),
+        "traceSeconds": round(trace.duration, 2),
+        "replays": len(results),
+        "failedReplays": sum(1 for result in results if result.error),
+        "elapsedSeconds": round(elapsed, 2),
+        "clientFramesSent": sum(result.sent for result in results),
+        "framesReceived": sum(result.received for result in results),
+        "unmatchedFrames": _count_by_type(result.unmatched for result in results),
+        "lostUpstreamFrames": _count_by_type(result.lost for result in results),
+        "latencyP50Ms": round(percentile(everything, 0.50), 2),
+        "latencyP99Ms": round(percentile(everything, 0.99), 2),
+        "events": {
+            event_type: {
+                "count": len(latencies),
+                "p50Ms": round(percentile(latencies, 0.50), 2),
+                "p99Ms": round(percentile(latencies, 0.99), 2),
+                "maxMs": round(max(latencies), 2)
+            }
+            for event_type, latencies in sorted(by_type.items(), key=lambda item: -len(item[1]))
+        }
+    }
+    if before and after:
+        summary["relayCpuSeconds"] = round(after.cpu_seconds - before.cpu_seconds, 4)
+        summary["relayCpuPercent"] = round((after.cpu_seconds - before.cpu_seconds) / elapsed * 100, 1)
+        summary["relayRssMb"] = round(after.rss_bytes / 2**20, 1)
+    errors = sorted({result.error for result in results if result.error})
+    if errors:
+        summary["errors"] = errors[:5]
+    return summary
+
+
+def _count_by_type(counts) -> Dict[str, int]:
+    totals: Dict[str, int] = defaultdict(int)
+    for by_type in counts:
+        for event_type, count in by_type.items():
+            totals[event_type] += count
+    return {event_type: count for event_type, count in sorted(totals.items()) if count}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay a recorded relay trace")
+    parser.add_argument("trace", help="Path to a .jsonl.gz trace")
+    parser.add_argument("--speed", type=float, default=1.0, help="Timeline speed as a multiple of the recording")
+    parser.add_argument("--repeat", type=int, default=1, help="Number of times to replay the trace")
+    parser.add_argument("--tail", type=float, default=1.0, help="Seconds to wait for stragglers after the timeline ends")
+    parser.add_argument("--relay-port", type=int, default=3102)
+    parser.add_argument("--upstream-port", type=int, default=9102)
+    parser.add_argument("--relay-url", help="Replay against an already running relay, which must use the stand-in as OPENAI_REALTIME_URL")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    trace = load_trace(args.trace)
+    relay = None
+    relay_pid = None
+
+    try:
+        if args.relay_url:
+            ws_url = args.relay_url
+        else:
+            state_dir = tempfile.mkdtemp()
+            relay = start_process(
+                ["-m", "uvicorn", "main:app", "--port", str(args.relay_port), "--log-level", "warning"],
+                {
+                    "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "bench"),
+                    "OPENAI_REALTIME_URL": f"ws://127.0.0.1:{args.upstream_port}",
+                    # Keep replayed sessions and spend out of the real stores
+                    "SESSION_STORE_PATH": os.path.join(state_dir, "replay-sessions.db"),
+                    "COST_LEDGER_PATH": os.path.join(state_dir, "replay-ledger.db"),
+                    "TRACE_ENABLED": "false",
+                    # A replay is one scripted client; its recorded pacing should not be throttled
+                    "CLIENT_AUDIO_BYTES_PER_SECOND": "0",
+                    "CLIENT_MESSAGES_PER_SECOND": "0",
+                    "UPSTREAM_RESUME_ATTEMPTS": "0",
+                }
+            )
+            relay_pid = relay.pid
+            wait_for_http(f"http://127.0.0.1:{args.relay_port}/health")
+            ws_url = f"ws://127.0.0.1:{args.relay_port}/ws"
+
+        before = sample_process(relay_pid) if relay_pid else None
+        started_at = time.monotonic()
+        results = asyncio.run(replay(trace, ws_url, args.upstream_port, args.speed, args.repeat, args.tail))
+        elapsed = time.monotonic() - started_at
+        after = sample_process(relay_pid) if relay_pid else None
+
+        summary = report(trace, results, elapsed, before, after)
+        if args.json:
+            print(json.dumps(summary, indent=2))
+        else:
+            events = summary.pop("events")
+            for key, value in summary.items():
+                print(f"{key:>28}: {value}")
+            for event_type, figures in events.items():
+                print(f"{event_type:>48}: {figures['count']:>6} p50 {figures['p50Ms']}ms p99 {figures['p99Ms']}ms")
+    finally:
+        if relay:
+            relay.terminate()
+            relay.wait()
+
+
+if __name__ == "__main__":
+    main()
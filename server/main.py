@@ -1,38 +1,269 @@
 import asyncio
+import base64
+import hmac
+import importlib
 import json
 import logging
 import os
-from typing import Dict, Any
+import random
+import tempfile
+import time
+import uuid
+from typing import Dict, Any, Optional, Union
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+# Taken before the framework and service imports so startup can be broken down
+_startup_started_at = time.perf_counter()
+
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
 
-from services.openai_relay import OpenAIRelay
-from models.websocket import MessageType, ErrorMessage, ConnectionMessage
+from services.openai_relay import (
+    OpenAIRelay, BargeInStats, OPENAI_REALTIME_URL as DEFAULT_REALTIME_URL, peek_event_type
+)
+from services.audio_coalescer import CoalescerStats
+from services.audio_reframer import ReframerStats
+from services.connection_pool import RealtimeConnectionPool
+from services.outbound_queue import OutboundQueue, OutboundStats
+from services.session_store import SessionStore
+from services.cost_ledger import CostLedger, parse_budgets
+from services.response_cache import ResponseCache, CacheStats
+from services.upstream_buffer import ResumeStats
+from services.metrics import RelayMetrics
+from services.call_recorder import CallRecorder, RecorderStats
+from services.trace_recorder import TraceRecorder, TraceStats
+from services.rate_limiter import TokenBucket, LimiterStats
+from services.transcript_hub import TranscriptHub, TranscriptStats
+from services.tool_registry import ToolRegistry, ToolStats
+from services.timer_wheel import TimerWheel, Timer, SupervisionStats
+from services.log_pipeline import LogPipeline, LazyPreview, parse_sample_rates
+from services.startup_timer import StartupTimer
+from models.cost import SessionCostTracker
+from models.audio import SAMPLE_RATE, BYTES_PER_SAMPLE, SUPPORTED_SAMPLE_RATES
+from models.websocket import MessageType, AudioMode, AudioCodec, ErrorMessage, ConnectionMessage
+
+# serve.py exports its wall-clock start so launch overhead shows up in the breakdown
+startup_timer = StartupTimer(_startup_started_at, launched_at=float(os.getenv("SERVER_LAUNCHED_AT", 0)) or None)
+startup_timer.mark("imports")
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging: records are queued and written by a background thread,
+# with optional per-event-type sampling (e.g. "response.done=0.1") and rate limits
+log_pipeline = LogPipeline(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    queue_size=int(os.getenv("LOG_QUEUE_SIZE", 10000)),
+    sample_rates=parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", "")),
+    rate_limit=float(os.getenv("LOG_RATE_LIMIT_PER_SECOND", 0))
+)
+log_pipeline.start()
 logger = logging.getLogger(__name__)
 
 # Environment validation
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 PORT = int(os.getenv("PORT", 3001))
 
+# Upstream Realtime endpoint, overridable e.g. to point at the benchmark mock
+OPENAI_REALTIME_URL = os.getenv("OPENAI_REALTIME_URL", DEFAULT_REALTIME_URL)
+
+# Input audio coalescing: merge append frames arriving within the window (0 disables)
+AUDIO_COALESCE_WINDOW_MS = int(os.getenv("AUDIO_COALESCE_WINDOW_MS", 0))
+AUDIO_COALESCE_MAX_MS = int(os.getenv("AUDIO_COALESCE_MAX_MS", 500))
+
+# Output audio re-framing: fixed-duration frames paced to keep the client a few
+# frames ahead, growing the lead after underruns (0 frame ms disables)
+OUTPUT_FRAME_MS = int(os.getenv("OUTPUT_FRAME_MS", 0))
+OUTPUT_JITTER_MIN_MS = float(os.getenv("OUTPUT_JITTER_MIN_MS", 80))
+OUTPUT_JITTER_MAX_MS = float(os.getenv("OUTPUT_JITTER_MAX_MS", 400))
+
+# Pre-warmed upstream connections (0 disables the pool)
+OPENAI_POOL_SIZE = int(os.getenv("OPENAI_POOL_SIZE", 0))
+OPENAI_POOL_MAX_IDLE_SECONDS = float(os.getenv("OPENAI_POOL_MAX_IDLE_SECONDS", 300))
+OPENAI_POOL_REFILL_PER_SECOND = float(os.getenv("OPENAI_POOL_REFILL_PER_SECOND", 2))
+
+# Per-client outbound queue: drop the oldest audio once the client lags this far behind
+OUTBOUND_QUEUE_MAX_MESSAGES = int(os.getenv("OUTBOUND_QUEUE_MAX_MESSAGES", 256))
+OUTBOUND_MAX_AUDIO_LAG_MS = float(os.getenv("OUTBOUND_MAX_AUDIO_LAG_MS", 5000))
+
+# Server-side silence suppression of input audio
+SILENCE_SUPPRESSION_ENABLED = os.getenv("SILENCE_SUPPRESSION_ENABLED", "false").lower() == "true"
+SILENCE_THRESHOLD_DBFS = float(os.getenv("SILENCE_THRESHOLD_DBFS", -50))
+SILENCE_PREROLL_MS = float(os.getenv("SILENCE_PREROLL_MS", 300))
+SILENCE_HANGOVER_MS = float(os.getenv("SILENCE_HANGOVER_MS", 1000))
+
+# Two-sided call recording to WAV files, written off the event loop
+RECORDING_ENABLED = os.getenv("RECORDING_ENABLED", "false").lower() == "true"
+RECORDING_DIR = os.getenv("RECORDING_DIR", "recordings")
+RECORDING_MAX_PENDING_CHUNKS = int(os.getenv("RECORDING_MAX_PENDING_CHUNKS", 512))
+
+# Gzip JSONL traces of every frame the relay receives, for bench/replay_trace.py
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "false").lower() == "true"
+TRACE_DIR = os.getenv("TRACE_DIR", "traces")
+TRACE_MAX_PENDING_EVENTS = int(os.getenv("TRACE_MAX_PENDING_EVENTS", 4096))
+
+# Latency histograms and per-event counters on /metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# SQLite file shared by all worker processes for host-wide session accounting
+SESSION_STORE_PATH = os.getenv(
+    "SESSION_STORE_PATH",
+    os.path.join(tempfile.gettempdir(), "voice-agent-sessions.db")
+)
+
+# Barge-in: on caller speech, drop queued agent audio and cancel/truncate the response upstream
+BARGE_IN_ENABLED = os.getenv("BARGE_IN_ENABLED", "true").lower() == "true"
+
+# Live transcripts per session, streamed to supervisors over SSE. Each observer
+# has its own bounded queue and is resynced from a snapshot if it falls behind.
+# The endpoints expose what callers say, so they require SUPERVISOR_TOKEN as a
+# bearer token and stay off unless one is configured.
+TRANSCRIPTS_ENABLED = os.getenv("TRANSCRIPTS_ENABLED", "false").lower() == "true"
+SUPERVISOR_TOKEN = os.getenv("SUPERVISOR_TOKEN", "")
+TRANSCRIPT_OBSERVER_QUEUE_SIZE = int(os.getenv("TRANSCRIPT_OBSERVER_QUEUE_SIZE", 256))
+TRANSCRIPT_KEEPALIVE_SECONDS = float(os.getenv("TRANSCRIPT_KEEPALIVE_SECONDS", 15))
+
+# Server-side tools: function calls for registered tools are run by the relay on
+# an executor instead of round-tripping through the client. TOOL_MODULES lists
+# modules exposing register(registry); services.tools holds the built-in ones.
+SERVER_TOOLS_ENABLED = os.getenv("SERVER_TOOLS_ENABLED", "false").lower() == "true"
+TOOL_MODULES = [name.strip() for name in os.getenv("TOOL_MODULES", "services.tools").split(",") if name.strip()]
+TOOL_EXECUTOR = os.getenv("TOOL_EXECUTOR", "thread")
+TOOL_WORKERS = int(os.getenv("TOOL_WORKERS", 4))
+TOOL_TIMEOUT_SECONDS = float(os.getenv("TOOL_TIMEOUT_SECONDS", 10))
+TOOL_CACHE_SIZE = int(os.getenv("TOOL_CACHE_SIZE", 256))
+
+# Client traffic guards: per-connection token buckets (0 disables), a frame size
+# checked before parsing, and a host-wide cap on concurrent sessions (0 disables)
+CLIENT_AUDIO_BYTES_PER_SECOND = float(os.getenv("CLIENT_AUDIO_BYTES_PER_SECOND", 256000))
+CLIENT_MESSAGES_PER_SECOND = float(os.getenv("CLIENT_MESSAGES_PER_SECOND", 20))
+CLIENT_MESSAGE_BURST = float(os.getenv("CLIENT_MESSAGE_BURST", 50))
+MAX_CLIENT_FRAME_BYTES = int(os.getenv("MAX_CLIENT_FRAME_BYTES", 262144))
+MAX_CONCURRENT_SESSIONS = int(os.getenv("MAX_CONCURRENT_SESSIONS", 0))
+
+# Connection supervision on one shared timer wheel: client heartbeats, upstream
+# keepalive pings after a quiet interval, and reaping of silent clients (0 disables)
+HEARTBEAT_INTERVAL_SECONDS = float(os.getenv("HEARTBEAT_INTERVAL_SECONDS", 30))
+CLIENT_IDLE_TIMEOUT_SECONDS = float(os.getenv("CLIENT_IDLE_TIMEOUT_SECONDS", 120))
+UPSTREAM_PING_TIMEOUT_SECONDS = float(os.getenv("UPSTREAM_PING_TIMEOUT_SECONDS", 10))
+
+# Automatic reconnection when the OpenAI socket drops (0 attempts disables it)
+UPSTREAM_RESUME_ATTEMPTS = int(os.getenv("UPSTREAM_RESUME_ATTEMPTS", 5))
+UPSTREAM_RESUME_HISTORY_ITEMS = int(os.getenv("UPSTREAM_RESUME_HISTORY_ITEMS", 20))
+UPSTREAM_RESUME_BUFFER_MS = float(os.getenv("UPSTREAM_RESUME_BUFFER_MS", 2000))
+
+# Replay of responses requested before any conversation items, e.g. fixed greetings
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+RESPONSE_CACHE_MAX_MB = float(os.getenv("RESPONSE_CACHE_MAX_MB", 64))
+RESPONSE_CACHE_DIR = os.getenv("RESPONSE_CACHE_DIR")
+
+# Per-tenant spend ledger, flushed periodically to a SQLite file shared by all workers.
+# Budgets are in dollars, e.g. TENANT_BUDGETS="acme=50,beta=5"; unset means unlimited.
+COST_LEDGER_PATH = os.getenv(
+    "COST_LEDGER_PATH",
+    os.path.join(tempfile.gettempdir(), "voice-agent-ledger.db")
+)
+COST_LEDGER_FLUSH_SECONDS = float(os.getenv("COST_LEDGER_FLUSH_SECONDS", 5))
+TENANT_BUDGETS = parse_budgets(os.getenv("TENANT_BUDGETS", ""))
+DEFAULT_TENANT_BUDGET_USD = float(os.getenv("DEFAULT_TENANT_BUDGET_USD")) if os.getenv("DEFAULT_TENANT_BUDGET_USD") else None
+SESSION_BUDGET_USD = float(os.getenv("SESSION_BUDGET_USD")) if os.getenv("SESSION_BUDGET_USD") else None
+DEFAULT_TENANT = "default"
+
 if not OPENAI_API_KEY:
     logger.error("ERROR: OPENAI_API_KEY is not set in environment variables")
     exit(1)
 
+if TRANSCRIPTS_ENABLED and not SUPERVISOR_TOKEN:
+    logger.error("TRANSCRIPTS_ENABLED requires SUPERVISOR_TOKEN; live transcripts are disabled")
+    TRANSCRIPTS_ENABLED = False
+
+# The NumPy-backed DSP modules stay off the startup path unless they are enabled:
+# suppression is loaded here when configured, the transcoder on first use
+if SILENCE_SUPPRESSION_ENABLED:
+    from services.silence_suppressor import SilenceSuppressor, SuppressionStats
+
+# Process-wide relay statistics
+audio_coalescer_stats = CoalescerStats()
+reframer_stats = ReframerStats()
+outbound_stats = OutboundStats()
+suppression_stats = SuppressionStats() if SILENCE_SUPPRESSION_ENABLED else None
+recorder_stats = RecorderStats()
+trace_stats = TraceStats()
+metrics = RelayMetrics() if METRICS_ENABLED else None
+resume_stats = ResumeStats()
+limiter_stats = LimiterStats()
+supervision_stats = SupervisionStats()
+barge_in_stats = BargeInStats()
+transcript_stats = TranscriptStats()
+tool_stats = ToolStats()
+tool_registry = None
+if SERVER_TOOLS_ENABLED:
+    tool_registry = ToolRegistry(
+        max_workers=TOOL_WORKERS,
+        timeout=TOOL_TIMEOUT_SECONDS,
+        cache_size=TOOL_CACHE_SIZE,
+        use_processes=TOOL_EXECUTOR == "process",
+        stats=tool_stats
+    )
+    tool_registry.load_modules(TOOL_MODULES)
+transcript_hub = TranscriptHub(TRANSCRIPT_OBSERVER_QUEUE_SIZE, stats=transcript_stats) if TRANSCRIPTS_ENABLED else None
+response_cache_stats = CacheStats()
+response_cache = ResponseCache(
+    int(RESPONSE_CACHE_MAX_MB * 1024 * 1024),
+    directory=RESPONSE_CACHE_DIR,
+    stats=response_cache_stats
+) if RESPONSE_CACHE_ENABLED else None
+startup_timer.mark("config")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    startup_timer.mark("app")
     logger.info("Starting WebSocket server...")
+    
+    app.state.active_sessions = 0
+    app.state.timer_wheel = TimerWheel(stats=supervision_stats)
+    app.state.timer_wheel.start()
+    app.state.session_store = SessionStore(SESSION_STORE_PATH)
+    app.state.cost_ledger = CostLedger(
+        COST_LEDGER_PATH,
+        flush_interval=COST_LEDGER_FLUSH_SECONDS,
+        budgets=TENANT_BUDGETS,
+        default_budget=DEFAULT_TENANT_BUDGET_USD
+    )
+    # Independent SQLite files on their own executor threads, opened together
+    await asyncio.gather(app.state.session_store.start(), app.state.cost_ledger.start())
+    startup_timer.mark("stores")
+    
+    app.state.connection_pool = None
+    if OPENAI_POOL_SIZE > 0:
+        app.state.connection_pool = RealtimeConnectionPool(
+            OPENAI_API_KEY,
+            OPENAI_POOL_SIZE,
+            max_idle_age=OPENAI_POOL_MAX_IDLE_SECONDS,
+            refill_per_second=OPENAI_POOL_REFILL_PER_SECOND,
+            ping_interval=HEARTBEAT_INTERVAL_SECONDS,
+            ping_timeout=UPSTREAM_PING_TIMEOUT_SECONDS,
+            url=OPENAI_REALTIME_URL
+        )
+        await app.state.connection_pool.start()
+    
+    startup_timer.finish()
+    # Warm the transcoder in the background so the first telephony call does not load NumPy
+    asyncio.get_running_loop().run_in_executor(None, importlib.import_module, "services.audio_codec")
+    
     yield
+    
     logger.info("Shutting down server...")
+    if app.state.connection_pool:
+        await app.state.connection_pool.stop()
+    await app.state.timer_wheel.stop()
+    await app.state.cost_ledger.stop()
+    await app.state.session_store.stop()
+    if tool_registry:
+        tool_registry.shutdown()
 
 
 # FastAPI app
@@ -56,7 +287,87 @@ app.add_middleware(
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "ok", "message": "Server is running"}
+    return {
+        "status": "ok",
+        "message": "Server is running",
+        "host": await app.state.session_store.get_summary()
+    }
+
+
+@app.get("/stats")
+async def stats():
+    """Relay statistics endpoint"""
+    pool = app.state.connection_pool
+    return {
+        "host": await app.state.session_store.get_summary(),
+        "startup": startup_timer.get_stats(),
+        "tenants": app.state.cost_ledger.get_stats(),
+        "audioCoalescing": audio_coalescer_stats.get_stats(),
+        "outputReframing": reframer_stats.get_stats(),
+        "outboundQueue": outbound_stats.get_stats(),
+        "silenceSuppression": suppression_stats.get_stats() if suppression_stats else None,
+        "recording": recorder_stats.get_stats(),
+        "tracing": trace_stats.get_stats(),
+        "responseCache": response_cache_stats.get_stats(),
+        "upstreamResume": resume_stats.get_stats(),
+        "supervision": supervision_stats.get_stats(),
+        "bargeIn": barge_in_stats.get_stats(),
+        "transcripts": transcript_stats.get_stats(),
+        "tools": tool_stats.get_stats(),
+        "rateLimiting": {**limiter_stats.get_stats(), "activeSessions": app.state.active_sessions},
+        "logging": log_pipeline.get_stats(),
+        "connectionPool": pool.get_stats() if pool else None
+    }
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus metrics endpoint"""
+    if not metrics:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    
+    host = await app.state.session_store.get_summary()
+    pool = app.state.connection_pool
+    gauges = {
+        "relay_host_active_sessions": host["activeSessions"],
+        "relay_outbound_queue_depth": outbound_stats.depth,
+        "relay_output_reframer_buffered_seconds": reframer_stats.buffered_ms / 1000,
+        "relay_worker_active_sessions": app.state.active_sessions,
+        "relay_transcript_observers": transcript_stats.observers,
+    }
+    counters = {
+        "relay_host_cost_dollars_total": host["cost"]["total"],
+        "relay_outbound_dropped_audio_total": outbound_stats.dropped_audio,
+        "relay_audio_coalescer_frames_in_total": audio_coalescer_stats.frames_in,
+        "relay_audio_coalescer_frames_out_total": audio_coalescer_stats.frames_out,
+        "relay_output_reframer_underruns_total": reframer_stats.underruns,
+        "relay_recorder_dropped_samples_total": recorder_stats.dropped_samples,
+        "relay_trace_dropped_events_total": trace_stats.dropped_events,
+        "relay_response_cache_hits_total": response_cache_stats.hits,
+        "relay_response_cache_misses_total": response_cache_stats.misses,
+        "relay_upstream_reconnects_total": resume_stats.reconnects,
+        "relay_upstream_failed_reconnects_total": resume_stats.failed_reconnects,
+        "relay_rejected_sessions_total": limiter_stats.rejected_sessions,
+        "relay_reaped_clients_total": supervision_stats.reaped_clients,
+        "relay_barge_in_interruptions_total": barge_in_stats.interruptions,
+        "relay_barge_in_dropped_audio_seconds_total": barge_in_stats.dropped_audio_ms / 1000,
+        "relay_transcript_observer_resyncs_total": transcript_stats.resyncs,
+        "relay_tool_calls_total": tool_stats.calls,
+        "relay_tool_cache_hits_total": tool_stats.cache_hits,
+        "relay_tool_errors_total": tool_stats.errors + tool_stats.timeouts,
+        "relay_upstream_ping_failures_total": supervision_stats.upstream_ping_failures,
+        "relay_oversized_frames_total": limiter_stats.oversized_frames,
+        "relay_throttled_audio_frames_total": limiter_stats.throttled_audio_frames,
+        "relay_throttled_messages_total": limiter_stats.throttled_messages,
+    }
+    if suppression_stats:
+        counters["relay_silence_audio_seconds_saved_total"] = suppression_stats.audio_ms_saved / 1000
+    if pool:
+        gauges["relay_pool_idle_connections"] = pool.idle_count
+        counters["relay_pool_hits_total"] = pool.stats.hits
+        counters["relay_pool_misses_total"] = pool.stats.misses
+    
+    return PlainTextResponse(metrics.render(gauges, counters), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/model-info")
@@ -64,58 +375,332 @@ async def model_info():
     """Model information endpoint"""
     return {
         "configured_model": "gpt-realtime",
-        "websocket_url": "wss://api.openai.com/v1/realtime?model=gpt-realtime",
+        "websocket_url": OPENAI_REALTIME_URL,
         "api_version": "realtime=v1",
         "upgrade_date": "2024-11-04",
         "previous_model": "gpt-4o-realtime-preview-2024-10-01"
     }
 
 
+def _require_transcripts(authorization: Optional[str]) -> TranscriptHub:
+    """Check the supervisor bearer token before exposing any transcript"""
+    if not transcript_hub:
+        raise HTTPException(status_code=404, detail="Transcripts are disabled")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), SUPERVISOR_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Supervisor token required", headers={"WWW-Authenticate": "Bearer"})
+    return transcript_hub
+
+
+@app.get("/sessions")
+async def list_sessions(authorization: Optional[str] = Header(None)):
+    """Live sessions on this worker that can be observed"""
+    return {"sessions": _require_transcripts(authorization).list_sessions()}
+
+
+@app.get("/sessions/{session_id}/transcript")
+async def session_transcript(session_id: str, authorization: Optional[str] = Header(None)):
+    """Transcript of a live session so far"""
+    transcript = _require_transcripts(authorization).get(session_id)
+    if not transcript:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return transcript.snapshot()
+
+
+@app.get("/sessions/{session_id}/transcript/stream")
+async def stream_session_transcript(session_id: str, authorization: Optional[str] = Header(None)):
+    """Server-sent events: a snapshot, then transcript updates until the session ends"""
+    hub = _require_transcripts(authorization)
+    observer = hub.subscribe(session_id)
+    if not observer:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    async def events():
+        try:
+            while True:
+                if not await observer.wait(TRANSCRIPT_KEEPALIVE_SECONDS):
+                    yield ": keepalive\n\n"
+                    continue
+                if observer.needs_snapshot:
+                    # First event, or the observer fell behind and its backlog was dropped
+                    observer.needs_snapshot = False
+                    transcript = hub.get(session_id)
+                    if transcript:
+                        yield _sse_event(transcript.snapshot())
+                for event in observer.drain():
+                    yield _sse_event(event)
+                if observer.closed:
+                    yield _sse_event({"type": "session.ended", "sessionId": session_id})
+                    return
+        finally:
+            hub.unsubscribe(session_id, observer)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _sse_event(event: Dict[str, Any]) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
 class ClientConnection:
-    def __init__(self, websocket: WebSocket):
+    def __init__(
+        self,
+        websocket: WebSocket,
+        audio_mode: AudioMode = AudioMode.JSON,
+        codec: AudioCodec = AudioCodec.PCM16,
+        sample_rate: int = SAMPLE_RATE,
+        connection_pool: Optional[RealtimeConnectionPool] = None,
+        session_store: Optional[SessionStore] = None,
+        cost_ledger: Optional[CostLedger] = None,
+        tenant: str = DEFAULT_TENANT,
+        timer_wheel: Optional[TimerWheel] = None,
+        session_id: Optional[str] = None
+    ):
+        self.session_id = session_id or uuid.uuid4().hex
         self.websocket = websocket
-        self.openai_relay = OpenAIRelay(OPENAI_API_KEY)
+        self.session_store = session_store
+        self.cost_ledger = cost_ledger
+        self.tenant = tenant
+        self.recorder = CallRecorder(
+            RECORDING_DIR,
+            self.session_id,
+            max_pending_chunks=RECORDING_MAX_PENDING_CHUNKS,
+            stats=recorder_stats
+        ) if RECORDING_ENABLED else None
+        self.tracer = TraceRecorder(
+            TRACE_DIR,
+            self.session_id,
+            header={"audioMode": audio_mode.value, "codec": codec.value, "sampleRate": sample_rate, "tenant": tenant},
+            max_pending_events=TRACE_MAX_PENDING_EVENTS,
+            stats=trace_stats
+        ) if TRACE_ENABLED else None
+        self.audio_mode = audio_mode
+        self.transcript = transcript_hub.open(self.session_id, tenant) if transcript_hub else None
+        self.openai_relay = OpenAIRelay(
+            OPENAI_API_KEY,
+            url=OPENAI_REALTIME_URL,
+            binary_audio=audio_mode == AudioMode.BINARY,
+            coalesce_window_ms=AUDIO_COALESCE_WINDOW_MS,
+            coalesce_max_ms=AUDIO_COALESCE_MAX_MS,
+            coalesce_stats=audio_coalescer_stats,
+            output_frame_ms=OUTPUT_FRAME_MS,
+            output_min_lead_ms=OUTPUT_JITTER_MIN_MS,
+            output_max_lead_ms=OUTPUT_JITTER_MAX_MS,
+            reframer_stats=reframer_stats,
+            connection_pool=connection_pool,
+            cost_listener=self._on_cost_update,
+            budget_check=self._check_budget,
+            metrics=metrics,
+            silence_suppressor=SilenceSuppressor(
+                threshold_dbfs=SILENCE_THRESHOLD_DBFS,
+                preroll_ms=SILENCE_PREROLL_MS,
+                hangover_ms=SILENCE_HANGOVER_MS,
+                stats=suppression_stats
+            ) if SILENCE_SUPPRESSION_ENABLED else None,
+            recorder=self.recorder,
+            tracer=self.tracer,
+            response_cache=response_cache,
+            transcoder=_make_transcoder(codec, sample_rate),
+            transcript=self.transcript,
+            tool_registry=tool_registry,
+            barge_in=BARGE_IN_ENABLED,
+            flush_output_audio=lambda: self.outbound.drop_audio(),
+            barge_in_stats=barge_in_stats,
+            resume_attempts=UPSTREAM_RESUME_ATTEMPTS,
+            resume_history_items=UPSTREAM_RESUME_HISTORY_ITEMS,
+            resume_buffer_ms=UPSTREAM_RESUME_BUFFER_MS,
+            resume_stats=resume_stats
+        )
+        # Bounded send queue so a slow client never stalls the upstream reader
+        self.outbound = OutboundQueue(
+            lambda message: _send_to_client(websocket, message),
+            max_messages=OUTBOUND_QUEUE_MAX_MESSAGES,
+            max_audio_lag_ms=OUTBOUND_MAX_AUDIO_LAG_MS,
+            bytes_per_ms=_client_bytes_per_ms(codec, sample_rate),
+            on_overflow=lambda: asyncio.create_task(websocket.close(code=1008)),
+            stats=outbound_stats
+        )
+        # Per-connection limits; audio is metered in bytes with one second of burst
+        self.audio_bucket = TokenBucket(CLIENT_AUDIO_BYTES_PER_SECOND, CLIENT_AUDIO_BYTES_PER_SECOND)
+        self.control_bucket = TokenBucket(CLIENT_MESSAGES_PER_SECOND, CLIENT_MESSAGE_BURST)
+        self.is_throttled = False
+        # Supervision state, checked by the shared timer wheel instead of a task per client
+        self.timer_wheel = timer_wheel
+        self.last_activity = time.monotonic()
         self.is_alive = True
-        self.heartbeat_task = None
+        self.heartbeat_timer: Optional[Timer] = None
+    
+    def _on_cost_update(self, cost_tracker: SessionCostTracker):
+        """Publish this session's cost to the host-wide session store"""
+        if self.session_store:
+            self.session_store.cost_updated(self.session_id, cost_tracker.get_cost_data())
+    
+    def _check_budget(self, cost_tracker: SessionCostTracker, incremental_cost: float) -> bool:
+        """Charge the tenant's ledger and check the tenant and session budgets"""
+        within_budget = True
+        if self.cost_ledger:
+            within_budget = self.cost_ledger.record(self.tenant, incremental_cost)
+        if SESSION_BUDGET_USD is not None and cost_tracker.session_cost > SESSION_BUDGET_USD:
+            within_budget = False
+        return within_budget
+    
+    async def send(self, message, event_type: Optional[str] = None):
+        """Queue a message for delivery to the client"""
+        self.outbound.put(message, event_type)
         
-    async def start_heartbeat(self):
-        """Start heartbeat monitoring"""
-        self.heartbeat_task = asyncio.create_task(self._heartbeat_monitor())
+    def start_heartbeat(self):
+        """Register this connection's periodic checks with the timer wheel"""
+        if self.timer_wheel:
+            # Spread first checks so connections opened together do not tick together
+            delay = random.uniform(1, HEARTBEAT_INTERVAL_SECONDS)
+            self.heartbeat_timer = self.timer_wheel.schedule(delay, self._on_heartbeat)
     
-    async def _heartbeat_monitor(self):
-        """Monitor client connection with periodic pings"""
-        try:
-            while self.is_alive:
-                await asyncio.sleep(30)  # 30 second intervals
-                if self.websocket.client_state.value == 1:  # OPEN state
-                    try:
-                        await self.websocket.ping()
-                    except Exception:
-                        logger.info("Client connection lost during ping")
-                        self.is_alive = False
-                        break
-        except asyncio.CancelledError:
-            pass
+    def _on_heartbeat(self):
+        """Heartbeat the client, keep the upstream alive and reap silent clients"""
+        if not self.is_alive:
+            return
+        now = time.monotonic()
+        if CLIENT_IDLE_TIMEOUT_SECONDS and now - self.last_activity > CLIENT_IDLE_TIMEOUT_SECONDS:
+            logger.info(f"Closing client idle for {now - self.last_activity:.0f}s")
+            supervision_stats.reaped_clients += 1
+            self.is_alive = False
+            asyncio.create_task(self.websocket.close(code=1001))
+            return
+        
+        # Clients answer with their own heartbeat, which counts as activity
+        supervision_stats.client_heartbeats += 1
+        self.outbound.put({"type": MessageType.HEARTBEAT.value}, MessageType.HEARTBEAT.value)
+        if self.openai_relay.is_connected and now - self.openai_relay.last_activity > HEARTBEAT_INTERVAL_SECONDS:
+            supervision_stats.upstream_pings += 1
+            asyncio.create_task(self._ping_upstream())
+        self.heartbeat_timer = self.timer_wheel.schedule(HEARTBEAT_INTERVAL_SECONDS, self._on_heartbeat)
+    
+    async def _ping_upstream(self):
+        if not await self.openai_relay.ping(UPSTREAM_PING_TIMEOUT_SECONDS):
+            supervision_stats.upstream_ping_failures += 1
     
     async def cleanup(self):
         """Clean up resources"""
         self.is_alive = False
-        if self.heartbeat_task:
-            self.heartbeat_task.cancel()
+        if self.heartbeat_timer:
+            self.heartbeat_timer.cancel()
+        await self.outbound.close()
         await self.openai_relay.disconnect()
+        if self.recorder:
+            await self.recorder.close()
+        if self.tracer:
+            await self.tracer.close()
+        if self.session_store:
+            self.session_store.session_ended(self.session_id)
+        if self.transcript:
+            transcript_hub.close(self.session_id)
 
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """Main WebSocket endpoint for client connections"""
     await websocket.accept()
-    logger.info("Client connected")
     
-    client = ClientConnection(websocket)
+    state = websocket.app.state
+    
+    # Clients opt into raw PCM16 binary frames with ?audio=binary
+    audio_mode = AudioMode.BINARY if websocket.query_params.get("audio") == AudioMode.BINARY.value else AudioMode.JSON
+    # Spend is accounted per tenant, from the X-Tenant-ID header (which a proxy can
+    # set) or ?tenant=. Only tenants with a configured budget are accepted, so clients
+    # cannot escape their budget under a fresh name or grow the ledger without bound
+    tenant = websocket.headers.get("x-tenant-id") or websocket.query_params.get("tenant") or DEFAULT_TENANT
+    if tenant != DEFAULT_TENANT and tenant not in TENANT_BUDGETS:
+        logger.warning(f"Rejecting session for unknown tenant {tenant!r}")
+        error_msg = ErrorMessage(
+            type=MessageType.ERROR,
+            message="Unknown tenant",
+            error="Tenant is not configured in TENANT_BUDGETS"
+        )
+        await websocket.send_text(error_msg.model_dump_json())
+        await websocket.close(code=1008)
+        return
+    # Telephony legs negotiate e.g. ?codec=pcmu&rate=8000; upstream audio stays 24 kHz PCM16
+    try:
+        codec = AudioCodec(websocket.query_params.get("codec", AudioCodec.PCM16.value))
+        sample_rate = int(websocket.query_params.get("rate", SAMPLE_RATE))
+        if sample_rate not in SUPPORTED_SAMPLE_RATES:
+            raise ValueError(f"unsupported sample rate {sample_rate}")
+    except ValueError as e:
+        error_msg = ErrorMessage(
+            type=MessageType.ERROR,
+            message="Unsupported audio format",
+            error=str(e)
+        )
+        await websocket.send_text(error_msg.model_dump_json())
+        await websocket.close(code=1008)
+        return
+    logger.info(
+        f"Client connected (audio mode: {audio_mode.value}, codec: {codec.value}@{sample_rate}Hz, tenant: {tenant})"
+    )
+    
+    cost_ledger = websocket.app.state.cost_ledger
+    if cost_ledger.is_over_budget(tenant):
+        logger.warning(f"Rejecting session for tenant {tenant}: budget exceeded")
+        error_msg = ErrorMessage(
+            type=MessageType.ERROR,
+            message="Budget exceeded",
+            error=f"Tenant {tenant} has reached its spending limit"
+        )
+        await websocket.send_text(error_msg.model_dump_json())
+        await websocket.close(code=1008)
+        return
+    
+    # The session limit is host-wide: admission counts live sessions of every worker
+    session_id = uuid.uuid4().hex
+    if MAX_CONCURRENT_SESSIONS:
+        if not await state.session_store.admit_session(session_id, MAX_CONCURRENT_SESSIONS):
+            limiter_stats.rejected_sessions += 1
+            logger.warning(f"Rejecting session: {MAX_CONCURRENT_SESSIONS} sessions already active on this host")
+            error_msg = ErrorMessage(
+                type=MessageType.ERROR,
+                message="Server busy",
+                error="Too many concurrent sessions, try again later"
+            )
+            await websocket.send_text(error_msg.model_dump_json())
+            await websocket.close(code=1013)
+            return
+    else:
+        state.session_store.session_started(session_id)
+    
+    try:
+        client = ClientConnection(
+            websocket,
+            audio_mode,
+            codec=codec,
+            sample_rate=sample_rate,
+            connection_pool=websocket.app.state.connection_pool,
+            session_store=websocket.app.state.session_store,
+            cost_ledger=cost_ledger,
+            tenant=tenant,
+            timer_wheel=state.timer_wheel,
+            session_id=session_id
+        )
+    except Exception as e:
+        # cleanup() never runs for this session, so give its host-wide slot back here
+        state.session_store.session_ended(session_id)
+        logger.error(f"Failed to set up session: {e}")
+        error_msg = ErrorMessage(
+            type=MessageType.ERROR,
+            message="Server error",
+            error=str(e)
+        )
+        await websocket.send_text(error_msg.model_dump_json())
+        await websocket.close(code=1011)
+        return
+    state.active_sessions += 1
     
     try:
         # Start heartbeat monitoring
-        await client.start_heartbeat()
+        client.start_heartbeat()
         
         # Connect to OpenAI
         await client.openai_relay.connect()
@@ -123,33 +708,45 @@ async def websocket_endpoint(websocket: WebSocket):
         # Send connection established message
         connection_msg = ConnectionMessage(
             type=MessageType.CONNECTION_ESTABLISHED,
-            message="Connected to OpenAI Realtime API"
+            message="Connected to OpenAI Realtime API",
+            audio_mode=audio_mode,
+            codec=codec,
+            sample_rate=sample_rate
         )
         await websocket.send_text(connection_msg.model_dump_json())
         
         # Start listening to OpenAI messages in background
-        openai_task = asyncio.create_task(
-            client.openai_relay.listen_for_messages(
-                lambda msg: _send_to_client(websocket, msg)
-            )
-        )
+        client.outbound.start()
+        client.openai_relay.listen_for_messages(client.send)
         
         # Listen for client messages
         try:
             while True:
                 # Receive message from client
-                data = await websocket.receive_text()
-                await _handle_client_message(client, data)
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+                client.last_activity = time.monotonic()
+                
+                if client.tracer:
+                    client.tracer.record_client(message.get("bytes") or message.get("text") or "")
+                
+                if message.get("bytes") is not None:
+                    data = message["bytes"]
+                    if await _admit_client_frame(client, len(data), is_audio=True):
+                        await _handle_client_audio(client, data)
+                elif message.get("text") is not None:
+                    data = message["text"]
+                    # Classify without parsing so rejected frames cost almost nothing
+                    is_audio = peek_event_type(data) == MessageType.INPUT_AUDIO_BUFFER_APPEND.value
+                    if await _admit_client_frame(client, len(data), is_audio):
+                        await _handle_client_message(client, data)
                 
         except WebSocketDisconnect:
             logger.info("Client disconnected")
         finally:
-            # Cancel OpenAI listening task
-            openai_task.cancel()
-            try:
-                await openai_task
-            except asyncio.CancelledError:
-                pass
+            # Stop listening to OpenAI
+            client.openai_relay.stop_listening()
             
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
@@ -163,35 +760,107 @@ async def websocket_endpoint(websocket: WebSocket):
         except:
             pass
     finally:
+        state.active_sessions -= 1
         await client.cleanup()
 
 
+def _make_transcoder(codec: AudioCodec, sample_rate: int):
+    """Transcoder for client legs that are not 24 kHz PCM16, imported on first use"""
+    if (codec, sample_rate) == (AudioCodec.PCM16, SAMPLE_RATE):
+        return None
+    from services.audio_codec import Transcoder
+    return Transcoder(codec, sample_rate)
+
+
+def _client_bytes_per_ms(codec: AudioCodec, sample_rate: int) -> float:
+    """Size of a millisecond of audio on the client leg; G.711 is one byte per sample"""
+    bytes_per_sample = BYTES_PER_SAMPLE if codec == AudioCodec.PCM16 else 1
+    return sample_rate * bytes_per_sample / 1000
+
+
+async def _admit_client_frame(client: ClientConnection, size: int, is_audio: bool) -> bool:
+    """Enforce the frame size and rate limits before a client frame is parsed"""
+    if size > MAX_CLIENT_FRAME_BYTES:
+        limiter_stats.oversized_frames += 1
+        logger.warning(f"Closing client after a {size} byte frame")
+        error_msg = ErrorMessage(
+            type=MessageType.ERROR,
+            message="Message too large",
+            error=f"Frames are limited to {MAX_CLIENT_FRAME_BYTES} bytes"
+        )
+        await client.websocket.send_text(error_msg.model_dump_json())
+        await client.websocket.close(code=1009)
+        raise WebSocketDisconnect(1009)
+    
+    if is_audio:
+        admitted = client.audio_bucket.consume(size)
+    else:
+        admitted = client.control_bucket.consume()
+    if admitted:
+        client.is_throttled = False
+        return True
+    
+    if is_audio:
+        limiter_stats.throttled_audio_frames += 1
+    else:
+        limiter_stats.throttled_messages += 1
+    # Report once per burst of rejected frames rather than once per frame
+    if not client.is_throttled:
+        client.is_throttled = True
+        error_msg = ErrorMessage(
+            type=MessageType.ERROR,
+            message="Rate limit exceeded",
+            error="Audio frames are being dropped" if is_audio else "Messages are being dropped"
+        )
+        await client.send(error_msg.model_dump_json(), MessageType.ERROR.value)
+    return False
+
+
 async def _handle_client_message(client: ClientConnection, data: str):
     """Handle incoming messages from client"""
     try:
         message = json.loads(data)
         message_type = message.get("type")
+        if metrics:
+            metrics.count_event("client", str(message_type), len(data))
+        if message_type == "session.update" and tool_registry:
+            # Server-side tools are advertised alongside any the client defines
+            data = client.openai_relay.add_server_tools(message)
+        client.openai_relay.note_client_event(message_type, message)
         
         # Log important message types
         if message_type == "session.update":
             instructions = message.get("session", {}).get("instructions", "")
-            preview = instructions[:100] + "..." if len(instructions) > 100 else instructions
-            logger.info(f"Session update: {preview}")
+            logger.info("Session update: %s", LazyPreview(instructions), extra={"event_type": message_type})
             
             # Reconnect if OpenAI connection was closed
             if not client.openai_relay.is_connected:
                 await client.openai_relay.reconnect_if_needed()
                 
         elif message_type == "response.create":
-            logger.info("Response requested")
+            logger.info("Response requested", extra={"event_type": message_type})
+            if response_cache:
+                await client.openai_relay.create_response(data, message)
+                return
+            
+        elif message_type == "response.cancel" and client.openai_relay.cancel_replay():
+            return  # A cached response was playing; nothing is running upstream
+            
+        elif message_type == MessageType.HEARTBEAT.value:
+            return  # Liveness only, already recorded by the receive loop
             
         elif message_type == "session.disconnect":
             logger.info("Client requested session disconnect")
             await client.openai_relay.disconnect(intentional=True)
             return  # Don't forward this message to OpenAI
+            
+        elif message_type == "input_audio_buffer.append" and client.openai_relay.processes_input_audio:
+            # Decode so the chunk can go through suppression and coalescing
+            await client.openai_relay.send_audio(base64.b64decode(message.get("audio", "")))
+            return
         
-        # Forward message to OpenAI
-        if client.openai_relay.is_connected:
+        # Forward message to OpenAI, buffered while a dropped connection is resumed
+        if client.openai_relay.is_connected or client.openai_relay.is_resuming:
             await client.openai_relay.send_message(data)
         else:
             logger.error("OpenAI WebSocket not available")
@@ -199,7 +868,7 @@ async def _handle_client_message(client: ClientConnection, data: str):
                 type=MessageType.ERROR,
                 message="OpenAI connection not available"
             )
-            await client.websocket.send_text(error_msg.model_dump_json())
+            await client.send(error_msg.model_dump_json(), MessageType.ERROR.value)
             
     except json.JSONDecodeError as e:
         logger.error(f"Error parsing client message: {e}")
@@ -208,7 +877,7 @@ async def _handle_client_message(client: ClientConnection, data: str):
             message="Error parsing message",
             error=str(e)
         )
-        await client.websocket.send_text(error_msg.model_dump_json())
+        await client.send(error_msg.model_dump_json(), MessageType.ERROR.value)
     except Exception as e:
         logger.error(f"Error processing client message: {e}")
         error_msg = ErrorMessage(
@@ -216,16 +885,40 @@ async def _handle_client_message(client: ClientConnection, data: str):
             message="Error processing message", 
             error=str(e)
         )
-        await client.websocket.send_text(error_msg.model_dump_json())
+        await client.send(error_msg.model_dump_json(), MessageType.ERROR.value)
+
+
+async def _handle_client_audio(client: ClientConnection, data: bytes):
+    """Handle raw PCM16 audio frames from a binary mode client"""
+    if client.audio_mode != AudioMode.BINARY:
+        error_msg = ErrorMessage(
+            type=MessageType.ERROR,
+            message="Binary audio frames require ?audio=binary"
+        )
+        await client.send(error_msg.model_dump_json(), MessageType.ERROR.value)
+        return
+    
+    if metrics:
+        metrics.count_event("client", MessageType.INPUT_AUDIO_BUFFER_APPEND.value, len(data))
+    await client.openai_relay.send_audio(data)
 
 
-async def _send_to_client(websocket: WebSocket, message: Dict[str, Any]):
+async def _send_to_client(websocket: WebSocket, message: Union[Dict[str, Any], str, bytes]):
     """Send message to client WebSocket"""
+    started_at = time.perf_counter()
     try:
-        if isinstance(message, dict):
+        if isinstance(message, bytes):
+            # Output audio for binary mode clients
+            await websocket.send_bytes(message)
+        elif isinstance(message, str):
+            # Raw upstream frames are relayed without re-encoding
+            await websocket.send_text(message)
+        elif isinstance(message, dict):
             await websocket.send_text(json.dumps(message))
         else:
             await websocket.send_text(str(message))
+        if metrics:
+            metrics.client_send.observe(time.perf_counter() - started_at)
     except Exception as e:
         logger.error(f"Error sending message to client: {e}")
 
@@ -0,0 +1,7 @@
+# Audio format used between the relay and the OpenAI Realtime API
+SAMPLE_RATE = 24000  # PCM16 mono
+BYTES_PER_SAMPLE = 2
+BYTES_PER_MS = SAMPLE_RATE * BYTES_PER_SAMPLE // 1000
+
+# Client leg sample rates the relay can resample to and from
+SUPPORTED_SAMPLE_RATES = (8000, 16000, 24000)
\ No newline at end of file
@@ -24,6 +24,13 @@ class SessionCostTracker:
     total_input_tokens: int = 0
     total_output_tokens: int = 0
     total_cached_tokens: int = 0
+    # Input audio not sent upstream thanks to silence suppression
+    audio_seconds_saved: float = 0.0
+    # Totals carried over from earlier upstream sessions of the same call,
+    # since usage counts restart when the relay resumes on a new connection
+    resumed_input_tokens: int = 0
+    resumed_output_tokens: int = 0
+    resumed_cached_tokens: int = 0
     
     def reset(self):
         """Reset cost tracking for new session"""
@@ -31,12 +38,22 @@ class SessionCostTracker:
         self.total_input_tokens = 0
         self.total_output_tokens = 0
         self.total_cached_tokens = 0
+        self.audio_seconds_saved = 0.0
+        self.resumed_input_tokens = 0
+        self.resumed_output_tokens = 0
+        self.resumed_cached_tokens = 0
+    
+    def resume(self):
+        """Keep cost and token totals across a reconnect to a new upstream session"""
+        self.resumed_input_tokens = self.total_input_tokens
+        self.resumed_output_tokens = self.total_output_tokens
+        self.resumed_cached_tokens = self.total_cached_tokens
     
     def update_from_usage(self, usage: Dict[str, Any]) -> float:
         """Update costs from OpenAI usage data and return incremental cost"""
-        input_tokens = usage.get("input_tokens", 0)
-        output_tokens = usage.get("output_tokens", 0)
-        cached_tokens = usage.get("input_token_details", {}).get("cached_tokens", 0)
+        input_tokens = usage.get("input_tokens", 0) + self.resumed_input_tokens
+        output_tokens = usage.get("output_tokens", 0) + self.resumed_output_tokens
+        cached_tokens = usage.get("input_token_details", {}).get("cached_tokens", 0) + self.resumed_cached_tokens
         
         # Track incremental tokens to avoid double counting
         new_input_tokens = input_tokens - self.total_input_tokens
@@ -62,5 +79,6 @@ class SessionCostTracker:
             "total": self.session_cost,
             "inputTokens": self.total_input_tokens,
             "outputTokens": self.total_output_tokens,
-            "cachedTokens": self.total_cached_tokens
+            "cachedTokens": self.total_cached_tokens,
+            "audioSecondsSaved": round(self.audio_seconds_saved, 2)
         }
\ No newline at end of file
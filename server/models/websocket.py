@@ -14,13 +14,26 @@ class MessageType(str, Enum):
     INPUT_AUDIO_BUFFER_SPEECH_STARTED = "input_audio_buffer.speech_started"
     INPUT_AUDIO_BUFFER_SPEECH_STOPPED = "input_audio_buffer.speech_stopped"
     RESPONSE_AUDIO_DELTA = "response.audio.delta"
+    RESPONSE_FUNCTION_CALL_ARGUMENTS_DONE = "response.function_call_arguments.done"
     CONVERSATION_ITEM_CREATED = "conversation.item.created"
     CONNECTION_ESTABLISHED = "connection.established"
     CONNECTION_CLOSED = "connection.closed"
     COST_UPDATE = "cost.update"
+    HEARTBEAT = "heartbeat"
     ERROR = "error"
 
 
+class AudioMode(str, Enum):
+    JSON = "json"
+    BINARY = "binary"
+
+
+class AudioCodec(str, Enum):
+    PCM16 = "pcm16"
+    PCMU = "pcmu"  # G.711 mu-law
+    PCMA = "pcma"  # G.711 A-law
+
+
 class WebSocketMessage(BaseModel):
     type: str
     data: Optional[Dict[str, Any]] = None
@@ -47,6 +60,9 @@ class ConnectionMessage(BaseModel):
     message: str
     code: Optional[int] = None
     reason: Optional[str] = None
+    audio_mode: Optional[AudioMode] = None
+    codec: Optional[AudioCodec] = None
+    sample_rate: Optional[int] = None
 
 
 class CostData(BaseModel):
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+"""
+Production launcher for the Python FastAPI server
+
+Runs several uvicorn worker processes without file watching. Live session
+counts and cumulative cost are shared between workers through the SQLite
+session store, so /health reports the whole host.
+
+Startup never installs anything: dependencies are checked with module
+lookups only, and each worker reports a timing breakdown once it is ready
+(also under "startup" in /stats).
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+import time
+
+# Import name -> requirements.txt package
+REQUIRED_MODULES = {
+    "fastapi": "fastapi",
+    "uvicorn": "uvicorn[standard]",
+    "websockets": "websockets",
+    "dotenv": "python-dotenv",
+    "pydantic": "pydantic",
+    "numpy": "numpy",
+}
+
+
+def check_dependencies():
+    """Exit with the missing packages listed, without importing or installing anything"""
+    missing = [package for module, package in REQUIRED_MODULES.items() if importlib.util.find_spec(module) is None]
+    if missing:
+        print(f"❌ Missing packages: {', '.join(missing)}. Run: pip install -r requirements.txt")
+        sys.exit(1)
+
+
+def default_workers() -> int:
+    """One worker per CPU unless WEB_CONCURRENCY is set"""
+    return int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+
+
+def select_loop() -> str:
+    """Prefer uvloop when it is installed"""
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def select_http() -> str:
+    """Prefer the httptools parser when it is installed"""
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the AI Voice Agent server in production mode")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 3001)))
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=int(os.getenv("MAX_CONNECTIONS_PER_WORKER", 0)) or None,
+        help="Maximum concurrent connections per worker (default: unlimited)"
+    )
+    return parser.parse_args()
+
+
+def main():
+    os.environ["SERVER_LAUNCHED_AT"] = str(time.time())
+    args = parse_args()
+    check_dependencies()
+
+    import uvicorn
+
+    loop = select_loop()
+    http = select_http()
+    print(f"🚀 Starting {args.workers} worker(s) on port {args.port} (loop: {loop}, http: {http})")
+
+    # Worker processes import the app themselves; a single worker serves the
+    # app imported here instead of importing main a second time
+    if args.workers > 1:
+        app = "main:app"
+    else:
+        from main import app
+
+    uvicorn.run(
+        app,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http,
+        limit_concurrency=args.max_connections,
+        # Refuse oversized frames in the protocol layer, before they are buffered
+        ws_max_size=int(os.getenv("MAX_CLIENT_FRAME_BYTES", 262144)),
+        log_level="info"
+    )
+
+
+if __name__ == "__main__":
+    main()
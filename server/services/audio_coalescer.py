@@ -0,0 +1,92 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Callable, Awaitable, List
+
+from models.audio import BYTES_PER_MS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CoalescerStats:
+    frames_in: int = 0
+    frames_out: int = 0
+    bytes_in: int = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batching counters and the achieved batching ratio"""
+        return {
+            "framesIn": self.frames_in,
+            "framesOut": self.frames_out,
+            "bytesIn": self.bytes_in,
+            "batchingRatio": self.frames_in / self.frames_out if self.frames_out else 0.0
+        }
+
+
+class AudioCoalescer:
+    """Merge consecutive input audio chunks into fewer upstream append frames"""
+
+    def __init__(
+        self,
+        send: Callable[[bytes], Awaitable[None]],
+        window_ms: int,
+        max_audio_ms: int,
+        stats: Optional[CoalescerStats] = None
+    ):
+        self._send = send
+        self.window = window_ms / 1000
+        self.max_bytes = max_audio_ms * BYTES_PER_MS
+        self.stats = stats or CoalescerStats()
+        self._chunks: List[bytes] = []
+        self._size = 0
+        self._flush_task: Optional[asyncio.Task] = None
+        # Serializes flushes so batches go upstream in arrival order
+        self._lock = asyncio.Lock()
+
+    async def add(self, pcm: bytes):
+        """Buffer a chunk, flushing once the size window is full"""
+        self.stats.frames_in += 1
+        self.stats.bytes_in += len(pcm)
+        self._chunks.append(pcm)
+        self._size += len(pcm)
+
+        if self._size >= self.max_bytes:
+            await self.flush()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_after_window())
+
+    async def flush(self):
+        """Send everything buffered so far as a single frame"""
+        self._cancel_timer()
+        async with self._lock:
+            if not self._chunks:
+                return
+            pcm = b"".join(self._chunks)
+            self._chunks = []
+            self._size = 0
+            self.stats.frames_out += 1
+            await self._send(pcm)
+
+    def close(self):
+        """Drop buffered audio and stop the flush timer"""
+        self._cancel_timer()
+        self._chunks = []
+        self._size = 0
+
+    async def _flush_after_window(self):
+        """Flush whatever arrived within the time window"""
+        try:
+            await asyncio.sleep(self.window)
+        except asyncio.CancelledError:
+            return
+        self._flush_task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Error flushing coalesced audio: {e}")
+
+    def _cancel_timer(self):
+        if self._flush_task is not None and self._flush_task is not asyncio.current_task():
+            self._flush_task.cancel()
+        self._flush_task = None
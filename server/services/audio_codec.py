@@ -0,0 +1,148 @@
+from math import gcd
+from typing import Optional
+
+import numpy as np
+
+from models.audio import SAMPLE_RATE
+from models.websocket import AudioCodec
+
+_BIAS = 0x84
+_CLIP = 8159
+
+
+def _build_ulaw_decode() -> np.ndarray:
+    code = ~np.arange(256, dtype=np.int32) & 0xFF
+    exponent = (code >> 4) & 0x07
+    mantissa = code & 0x0F
+    magnitude = (((mantissa << 3) + _BIAS) << exponent) - _BIAS
+    return np.where(code & 0x80, -magnitude, magnitude).astype(np.int16)
+
+
+def _build_alaw_decode() -> np.ndarray:
+    code = np.arange(256, dtype=np.int32) ^ 0x55
+    exponent = (code >> 4) & 0x07
+    mantissa = code & 0x0F
+    magnitude = np.where(
+        exponent == 0,
+        (mantissa << 4) + 8,
+        ((mantissa << 4) + 0x108) << np.maximum(exponent - 1, 0)
+    )
+    return np.where(code & 0x80, magnitude, -magnitude).astype(np.int16)
+
+
+def _segment(magnitude: np.ndarray) -> np.ndarray:
+    """Position of the highest set bit above bit 7, i.e. the G.711 segment"""
+    return np.clip(np.floor(np.log2(np.maximum(magnitude, 1))).astype(np.int32) - 7, 0, 7)
+
+
+def _build_ulaw_encode() -> np.ndarray:
+    # Works on 14-bit magnitudes like the reference G.711 implementation
+    samples = np.arange(-32768, 32768, dtype=np.int32) >> 2
+    sign = np.where(samples < 0, 0x80, 0)
+    # Clipped inputs land past the last segment and saturate to its top code
+    magnitude = np.minimum(np.minimum(np.abs(samples), _CLIP) + (_BIAS >> 2), 0x1FFF)
+    exponent = _segment(magnitude << 2)
+    mantissa = (magnitude >> (exponent + 1)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8)
+
+
+def _build_alaw_encode() -> np.ndarray:
+    samples = np.arange(-32768, 32768, dtype=np.int32)
+    sign = np.where(samples >= 0, 0x80, 0)
+    magnitude = np.minimum(np.where(samples < 0, -samples - 1, samples), 32767) >> 3
+    exponent = np.clip(_segment(magnitude << 3), 0, 7)
+    mantissa = np.where(exponent == 0, magnitude >> 1, magnitude >> exponent) & 0x0F
+    return ((sign | (exponent << 4) | mantissa) ^ 0x55).astype(np.uint8)
+
+
+# Decode tables map each code byte to a sample; encode tables are indexed by
+# the sample offset by 32768 so a whole frame is one fancy-indexing lookup.
+_DECODE = {AudioCodec.PCMU: _build_ulaw_decode(), AudioCodec.PCMA: _build_alaw_decode()}
+_ENCODE = {AudioCodec.PCMU: _build_ulaw_encode(), AudioCodec.PCMA: _build_alaw_encode()}
+
+
+def g711_decode(codec: AudioCodec, payload: bytes) -> np.ndarray:
+    """Decode G.711 bytes to int16 samples"""
+    return _DECODE[codec][np.frombuffer(payload, dtype=np.uint8)]
+
+
+def g711_encode(codec: AudioCodec, samples: np.ndarray) -> bytes:
+    """Encode int16 samples as G.711 bytes"""
+    return _ENCODE[codec][samples.astype(np.int32) + 32768].tobytes()
+
+
+class PolyphaseResampler:
+    """Streaming rational-ratio resampler for mono int16 audio
+
+    The windowed-sinc low-pass is split into up phases so each output sample
+    is a single dot product of taps_per_phase input samples, evaluated for
+    the whole frame at once. The last input samples are kept between calls
+    so consecutive frames resample without seams.
+    """
+
+    def __init__(self, rate_in: int, rate_out: int, taps_per_phase: int = 16):
+        divisor = gcd(rate_in, rate_out)
+        self.up = rate_out // divisor
+        self.down = rate_in // divisor
+        self.taps_per_phase = taps_per_phase
+
+        taps = taps_per_phase * self.up
+        cutoff = 0.5 / max(self.up, self.down) * 0.94
+        n = np.arange(taps) - (taps - 1) / 2
+        prototype = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(taps, 8.0) * self.up
+        # phases[p, k] is tap p + k * up; reversed so a phase dots with inputs oldest first
+        self._phases = prototype.reshape(taps_per_phase, self.up).T[:, ::-1].astype(np.float32)
+        self._history = np.zeros(taps_per_phase - 1, dtype=np.float32)
+        # Position of the next output on the upsampled time axis of history + frame
+        self._next = (taps_per_phase - 1) * self.up
+        self._offsets = np.arange(-(taps_per_phase - 1), 1)
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Resample one frame, returning however many samples it completes"""
+        signal = np.concatenate((self._history, samples.astype(np.float32)))
+        end = len(signal) * self.up
+        positions = np.arange(self._next, end, self.down)
+        self._next = (positions[-1] + self.down if len(positions) else self._next) - len(samples) * self.up
+        self._history = signal[len(signal) - len(self._history):]
+        if not len(positions):
+            return np.zeros(0, dtype=np.int16)
+
+        windows = signal[(positions // self.up)[:, None] + self._offsets]
+        output = np.einsum("ij,ij->i", windows, self._phases[positions % self.up])
+        return np.clip(np.rint(output), -32768, 32767).astype(np.int16)
+
+
+class Transcoder:
+    """Convert a client audio leg to and from the relay's 24 kHz PCM16
+
+    Decoding covers client-to-relay audio and encoding relay-to-client
+    audio; each direction keeps its own resampler state.
+    """
+
+    def __init__(self, codec: AudioCodec, sample_rate: int):
+        self.codec = codec
+        self.sample_rate = sample_rate
+        self._upsampler: Optional[PolyphaseResampler] = None
+        self._downsampler: Optional[PolyphaseResampler] = None
+        if sample_rate != SAMPLE_RATE:
+            self._upsampler = PolyphaseResampler(sample_rate, SAMPLE_RATE)
+            self._downsampler = PolyphaseResampler(SAMPLE_RATE, sample_rate)
+
+    def decode(self, payload: bytes) -> bytes:
+        """Client audio to 24 kHz PCM16"""
+        if self.codec == AudioCodec.PCM16:
+            samples = np.frombuffer(payload, dtype="<i2", count=len(payload) // 2)
+        else:
+            samples = g711_decode(self.codec, payload)
+        if self._upsampler:
+            samples = self._upsampler.process(samples)
+        return samples.astype("<i2").tobytes()
+
+    def encode(self, pcm: bytes) -> bytes:
+        """24 kHz PCM16 to client audio"""
+        samples = np.frombuffer(pcm, dtype="<i2", count=len(pcm) // 2)
+        if self._downsampler:
+            samples = self._downsampler.process(samples)
+        if self.codec == AudioCodec.PCM16:
+            return samples.astype("<i2").tobytes()
+        return g711_encode(self.codec, samples)
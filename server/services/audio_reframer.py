@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Callable, Awaitable, Deque
+
+from models.audio import BYTES_PER_MS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReframerStats:
+    frames_in: int = 0
+    frames_out: int = 0
+    underruns: int = 0
+    buffered_ms: float = 0.0
+    max_buffered_ms: float = 0.0
+    dropped_ms: float = 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get re-framing counters, jitter buffer depth and underruns"""
+        return {
+            "framesIn": self.frames_in,
+            "framesOut": self.frames_out,
+            "underruns": self.underruns,
+            "bufferedMs": round(self.buffered_ms, 1),
+            "maxBufferedMs": round(self.max_buffered_ms, 1),
+            "droppedMs": round(self.dropped_ms, 1)
+        }
+
+
+class AudioReframer:
+    """Cut output audio into fixed-duration frames paced to the client
+
+    Upstream deltas arrive in irregular sizes and bursts. They are buffered
+    and released as frame_ms chunks, keeping the client target_lead_ms of
+    audio ahead of real-time playback; that lead is the jitter buffer. When
+    the client runs dry before more audio arrives (an underrun) the lead
+    grows by a frame, up to max_lead_ms, and every response that plays out
+    without one shrinks it back toward min_lead_ms. A response that has
+    ended keeps its pacing; only its last partial frame goes out early.
+    Upstream produces audio faster than real time, so seconds may still be
+    held at that point, and client events that must follow the audio (such
+    as response.done) are held until it is out instead of blocking the
+    upstream reader.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[bytes], Awaitable[None]],
+        frame_ms: int = 40,
+        min_lead_ms: float = 80.0,
+        max_lead_ms: float = 400.0,
+        stats: Optional[ReframerStats] = None
+    ):
+        self._emit = emit
+        self.frame_ms = frame_ms
+        self.frame_bytes = frame_ms * BYTES_PER_MS
+        self.min_lead_ms = min_lead_ms
+        self.max_lead_ms = max(max_lead_ms, min_lead_ms)
+        self.target_lead_ms = min_lead_ms
+        self.stats = stats or ReframerStats()
+        self._buffer = bytearray()
+        # Client playback clock, started by the first frame of a response
+        self._playout_started_at: Optional[float] = None
+        self._sent_ms = 0.0
+        self._underrun_in_response = False
+        self._pacer: Optional[asyncio.Task] = None
+        # Serializes releases so frames reach the client in order
+        self._lock = asyncio.Lock()
+        # Buffered bytes left of a response that has ended, and the client
+        # events waiting for them to be sent
+        self._end_at: Optional[int] = None
+        self._held: Deque[Callable[[], Awaitable[None]]] = deque()
+
+    @property
+    def buffered_ms(self) -> float:
+        return len(self._buffer) / BYTES_PER_MS
+
+    @property
+    def holding(self) -> bool:
+        """Whether client events have to wait for the end of a response"""
+        return self._end_at is not None or bool(self._held)
+
+    def add(self, pcm: bytes):
+        """Buffer upstream audio; frames are released by the pacer"""
+        self.stats.frames_in += 1
+        self._buffer += pcm
+        self._account(len(pcm) / BYTES_PER_MS)
+        if self._pacer is None or self._pacer.done():
+            self._pacer = asyncio.create_task(self._pace())
+
+    def end_response(self):
+        """Mark the end of the response's audio, e.g. on response.audio.done"""
+        if self._end_at is None:
+            self._end_at = len(self._buffer)
+        if self._pacer is None or self._pacer.done():
+            self._pacer = asyncio.create_task(self._pace())
+
+    def hold(self, deliver: Callable[[], Awaitable[None]]):
+        """Send a client event once the ended response's audio is out"""
+        self._held.append(deliver)
+
+    def drop(self) -> float:
+        """Discard held audio, e.g. when the caller interrupts, returning its duration"""
+        self._stop_pacer()
+        dropped_ms = self.buffered_ms
+        self._buffer.clear()
+        self._account(-dropped_ms)
+        self.stats.dropped_ms += dropped_ms
+        self._playout_started_at = None
+        self._underrun_in_response = False
+        if self.holding:
+            # Nothing is left to wait for; send the held events now
+            self._end_at = 0
+            self._pacer = asyncio.create_task(self._pace())
+        return dropped_ms
+
+    def close(self):
+        self.drop()
+
+    def _lead_ms(self) -> float:
+        """Audio the client has been sent but not yet played"""
+        if self._playout_started_at is None:
+            return 0.0
+        return self._sent_ms - (time.monotonic() - self._playout_started_at) * 1000
+
+    async def _pace(self):
+        try:
+            while True:
+                if self._end_at is not None and self._end_at < self.frame_bytes:
+                    await self._finish_response()
+                elif len(self._buffer) >= self.frame_bytes:
+                    await self._release()
+                    if self._end_at is not None and self._end_at < self.frame_bytes:
+                        continue
+                    # Sleep until the client's lead falls below the target again
+                    await asyncio.sleep(max(self._lead_ms() - self.target_lead_ms + 1, 1) / 1000)
+                else:
+                    break
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Error releasing output audio: {e}")
+
+    async def _release(self):
+        """Send whole frames until the client is target_lead_ms ahead"""
+        async with self._lock:
+            lead = self._lead_ms()
+            if self._playout_started_at is not None and lead < 0:
+                # The client played everything it had before more audio arrived
+                self.stats.underruns += 1
+                self._underrun_in_response = True
+                self.target_lead_ms = min(self.target_lead_ms + self.frame_ms, self.max_lead_ms)
+                self._playout_started_at = None
+                lead = 0.0
+            while lead < self.target_lead_ms and len(self._buffer) >= self.frame_bytes:
+                if self._end_at is not None and self._end_at < self.frame_bytes:
+                    break
+                await self._send(self.frame_bytes)
+                lead += self.frame_ms
+
+    async def _finish_response(self):
+        """Send the ended response's last partial frame, then the held events"""
+        async with self._lock:
+            if self._end_at:
+                await self._send(self._end_at)
+            self._end_at = None
+            self._end_response()
+        while self._held:
+            await self._held.popleft()()
+
+    async def _send(self, size: int):
+        frame = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        if self._end_at is not None:
+            self._end_at -= size
+        frame_ms = size / BYTES_PER_MS
+        self._account(-frame_ms)
+        if self._playout_started_at is None:
+            self._playout_started_at = time.monotonic()
+            self._sent_ms = 0.0
+        self._sent_ms += frame_ms
+        self.stats.frames_out += 1
+        await self._emit(frame)
+
+    def _end_response(self):
+        if not self._underrun_in_response and self._playout_started_at is not None:
+            self.target_lead_ms = max(self.target_lead_ms - self.frame_ms, self.min_lead_ms)
+        self._underrun_in_response = False
+        self._playout_started_at = None
+
+    def _account(self, delta_ms: float):
+        self.stats.buffered_ms += delta_ms
+        self.stats.max_buffered_ms = max(self.stats.max_buffered_ms, self.stats.buffered_ms)
+
+    def _stop_pacer(self):
+        if self._pacer is not None and self._pacer is not asyncio.current_task():
+            self._pacer.cancel()
+        self._pacer = None
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import mmap
+import os
+import queue
+import struct
+import threading
+from dataclasses import dataclass
+from typing import Optional, Dict, Any
+
+from models.audio import SAMPLE_RATE, BYTES_PER_SAMPLE
+
+logger = logging.getLogger(__name__)
+
+_WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+
+_INPUT = "input"
+_OUTPUT = "output"
+_CLOSE = object()
+
+
+@dataclass
+class RecorderStats:
+    recordings: int = 0
+    bytes_written: int = 0
+    dropped_samples: int = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get recording totals and samples lost to a slow disk"""
+        return {
+            "recordings": self.recordings,
+            "bytesWritten": self.bytes_written,
+            "droppedSamples": self.dropped_samples
+        }
+
+
+class MmapWavWriter:
+    """PCM16 mono WAV file written through a preallocated memory map"""
+
+    def __init__(self, path: str, preallocate_bytes: int, sample_rate: int = SAMPLE_RATE):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.grow_bytes = preallocate_bytes
+        self.size = 0
+        self._file = open(path, "w+b")
+        self._capacity = 0
+        self._map: Optional[mmap.mmap] = None
+        self._resize(preallocate_bytes)
+        self._write_header()
+
+    def write(self, pcm: bytes):
+        """Append PCM16 samples, growing the mapping when it is full"""
+        end = self.size + len(pcm)
+        if end > self._capacity:
+            self._resize(max(end, self._capacity + self.grow_bytes))
+        start = _WAV_HEADER.size + self.size
+        self._map[start:start + len(pcm)] = pcm
+        self.size = end
+
+    def close(self):
+        """Write the final header and trim the preallocated tail"""
+        self._write_header()
+        self._map.flush()
+        self._map.close()
+        self._file.truncate(_WAV_HEADER.size + self.size)
+        self._file.close()
+
+    def _resize(self, capacity: int):
+        if self._map is not None:
+            self._map.flush()
+            self._map.close()
+        self._file.truncate(_WAV_HEADER.size + capacity)
+        self._map = mmap.mmap(self._file.fileno(), _WAV_HEADER.size + capacity)
+        self._capacity = capacity
+
+    def _write_header(self):
+        self._map[:_WAV_HEADER.size] = _WAV_HEADER.pack(
+            b"RIFF", 36 + self.size, b"WAVE",
+            b"fmt ", 16, 1, 1, self.sample_rate, self.sample_rate * BYTES_PER_SAMPLE, BYTES_PER_SAMPLE, 16,
+            b"data", self.size
+        )
+
+
+class CallRecorder:
+    """Record both sides of a call to WAV files on a background thread
+
+    The event loop only hands PCM chunks to a bounded queue; file creation,
+    preallocation and writes all happen on the writer thread. When the
+    queue is full the chunk is dropped and counted instead of blocking
+    live audio.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        session_id: str,
+        max_pending_chunks: int = 512,
+        preallocate_seconds: int = 60,
+        stats: Optional[RecorderStats] = None
+    ):
+        self.directory = directory
+        self.session_id = session_id
+        self.preallocate_bytes = preallocate_seconds * SAMPLE_RATE * BYTES_PER_SAMPLE
+        self.stats = stats or RecorderStats()
+        self.dropped_samples = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending_chunks)
+        self._thread = threading.Thread(target=self._run, name=f"recorder-{session_id[:8]}", daemon=True)
+        self._thread.start()
+        self.stats.recordings += 1
+
+    def record_input(self, pcm: bytes):
+        """Tap audio received from the caller"""
+        self._put(_INPUT, pcm)
+
+    def record_output(self, pcm: bytes):
+        """Tap audio sent to the caller"""
+        self._put(_OUTPUT, pcm)
+
+    async def close(self):
+        """Finish writing both files without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._finish)
+        if self.dropped_samples:
+            logger.warning(f"Recording {self.session_id} dropped {self.dropped_samples} samples")
+
+    def _put(self, channel: str, pcm: bytes):
+        try:
+            self._queue.put_nowait((channel, pcm))
+        except queue.Full:
+            dropped = len(pcm) // BYTES_PER_SAMPLE
+            self.dropped_samples += dropped
+            self.stats.dropped_samples += dropped
+
+    def _finish(self):
+        self._queue.put(_CLOSE)
+        self._thread.join()
+
+    def _run(self):
+        """Writer thread: drain the queue into the two WAV files"""
+        writers: Dict[str, MmapWavWriter] = {}
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for channel in (_INPUT, _OUTPUT):
+                path = os.path.join(self.directory, f"{self.session_id}-{channel}.wav")
+                writers[channel] = MmapWavWriter(path, self.preallocate_bytes)
+
+            while True:
+                item = self._queue.get()
+                if item is _CLOSE:
+                    break
+                channel, pcm = item
+                writers[channel].write(pcm)
+                self.stats.bytes_written += len(pcm)
+        except Exception as e:
+            logger.error(f"Recording {self.session_id} failed: {e}")
+            # Keep draining so close() still returns
+            while self._queue.get() is not _CLOSE:
+                pass
+        finally:
+            for writer in writers.values():
+                writer.close()
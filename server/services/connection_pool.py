@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Deque, Tuple
+
+from websockets.client import WebSocketClientProtocol
+from websockets.exceptions import ConnectionClosed
+
+from services.openai_relay import OPENAI_REALTIME_URL, connect_realtime
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolStats:
+    hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    dial_failures: int = 0
+    ping_failures: int = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool hit/miss counters"""
+        acquired = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "dialFailures": self.dial_failures,
+            "pingFailures": self.ping_failures,
+            "hitRate": self.hits / acquired if acquired else 0.0
+        }
+
+
+class RealtimeConnectionPool:
+    """Keep pre-dialed upstream Realtime connections ready for new calls"""
+
+    def __init__(
+        self,
+        api_key: str,
+        size: int,
+        max_idle_age: float = 300.0,
+        refill_per_second: float = 2.0,
+        ping_interval: float = 30.0,
+        ping_timeout: float = 10.0,
+        url: str = OPENAI_REALTIME_URL
+    ):
+        self.api_key = api_key
+        self.size = size
+        self.max_idle_age = max_idle_age
+        # A non-positive rate means no limit rather than a division by zero
+        self.refill_interval = 1 / refill_per_second if refill_per_second > 0 else 0.0
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.url = url
+        self._last_ping = time.monotonic()
+        self.stats = PoolStats()
+        self._idle: Deque[Tuple[WebSocketClientProtocol, float]] = deque()
+        self._wake = asyncio.Event()
+        self._refill_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start filling the pool in the background"""
+        self._refill_task = asyncio.create_task(self._refill_loop())
+        logger.info(f"Upstream connection pool started (size: {self.size})")
+
+    async def stop(self):
+        """Stop refilling and close all idle connections"""
+        if self._refill_task:
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+        while self._idle:
+            websocket, _ = self._idle.popleft()
+            await websocket.close()
+        logger.info("Upstream connection pool stopped")
+
+    async def acquire(self) -> WebSocketClientProtocol:
+        """Take a ready connection from the pool, dialing one on a miss"""
+        now = time.monotonic()
+        while self._idle:
+            websocket, created_at = self._idle.popleft()
+            if websocket.closed or now - created_at > self.max_idle_age:
+                self.stats.expired += 1
+                asyncio.create_task(websocket.close())
+                continue
+            self.stats.hits += 1
+            self._wake.set()
+            return websocket
+
+        self.stats.misses += 1
+        self._wake.set()
+        return await connect_realtime(self.api_key, self.url)
+
+    @property
+    def idle_count(self) -> int:
+        """Number of ready connections currently pooled"""
+        return len(self._idle)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool counters along with its current fill level"""
+        return {**self.stats.get_stats(), "idle": self.idle_count, "size": self.size}
+
+    async def _refill_loop(self):
+        """Dial new connections at the refill rate until the pool is full"""
+        while True:
+            await self._evict_stale()
+            if self.ping_interval > 0 and time.monotonic() - self._last_ping >= self.ping_interval:
+                await self._ping_idle()
+
+            if len(self._idle) < self.size:
+                try:
+                    websocket = await connect_realtime(self.api_key, self.url)
+                    self._idle.append((websocket, time.monotonic()))
+                except Exception as e:
+                    self.stats.dial_failures += 1
+                    logger.error(f"Failed to pre-dial OpenAI connection: {e}")
+                await asyncio.sleep(self.refill_interval)
+                continue
+
+            # Pool is full: sleep until a connection is taken, one may expire or pings are due
+            timeout = self.max_idle_age / 2
+            if self.ping_interval > 0:
+                timeout = min(timeout, self.ping_interval)
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _evict_stale(self):
+        """Close pooled connections that were dropped or sat idle too long"""
+        now = time.monotonic()
+        while self._idle:
+            websocket, created_at = self._idle[0]
+            if not websocket.closed and now - created_at <= self.max_idle_age:
+                break
+            self._idle.popleft()
+            self.stats.expired += 1
+            await websocket.close()
+
+    async def _ping_idle(self):
+        """Ping every pooled connection and drop those that do not answer"""
+        # Pooled sockets are dialed without library pings, so a half-open one
+        # would otherwise look healthy until a call is handed to it
+        self._last_ping = time.monotonic()
+        members = list(self._idle)
+        results = await asyncio.gather(*(self._ping(websocket) for websocket, _ in members))
+        for (websocket, created_at), alive in zip(members, results):
+            if alive:
+                continue
+            try:
+                self._idle.remove((websocket, created_at))
+            except ValueError:
+                # Handed out while the ping was in flight
+                continue
+            self.stats.ping_failures += 1
+            await websocket.close()
+
+    async def _ping(self, websocket: WebSocketClientProtocol) -> bool:
+        try:
+            pong_waiter = await websocket.ping()
+            await asyncio.wait_for(pong_waiter, self.ping_timeout)
+            return True
+        except (asyncio.TimeoutError, ConnectionClosed):
+            return False
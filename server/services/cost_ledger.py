@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tenant_spend (
+    tenant TEXT PRIMARY KEY,
+    cost REAL NOT NULL DEFAULT 0,
+    responses INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+)
+"""
+
+_UPSERT = """
+INSERT INTO tenant_spend (tenant, cost, responses, updated_at) VALUES (?, ?, ?, ?)
+ON CONFLICT(tenant) DO UPDATE SET
+    cost = cost + excluded.cost,
+    responses = responses + excluded.responses,
+    updated_at = excluded.updated_at
+"""
+
+
+def parse_budgets(spec: str) -> Dict[str, float]:
+    """Parse "acme=5,beta=12.5" into a budget in dollars per tenant"""
+    budgets = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        tenant, _, budget = entry.partition("=")
+        budgets[tenant.strip()] = float(budget)
+    return budgets
+
+
+@dataclass
+class TenantSpend:
+    # Host-wide total as of the last flush, including other workers
+    persisted: float = 0.0
+    # Local spend currently being written
+    in_flight: float = 0.0
+    # Local spend not yet flushed
+    pending: float = 0.0
+    pending_responses: int = 0
+
+    @property
+    def total(self) -> float:
+        return self.persisted + self.in_flight + self.pending
+
+
+class CostLedger:
+    """Process-wide running spend per tenant with budget enforcement
+
+    record() updates an in-memory total and checks it against the tenant's
+    budget in O(1) on every response.done. Pending spend is batch-flushed to
+    a local SQLite file on a background thread, and the flush reads back the
+    host-wide totals so budgets also account for other worker processes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval: float = 5.0,
+        budgets: Optional[Dict[str, float]] = None,
+        default_budget: Optional[float] = None
+    ):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.budgets = budgets or {}
+        self.default_budget = default_budget
+        self._tenants: Dict[str, TenantSpend] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cost-ledger")
+        self._db: Optional[sqlite3.Connection] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Load persisted totals and start the periodic flush"""
+        totals = await self._run(self._open)
+        self._apply_totals(totals)
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info(f"Cost ledger ready at {self.path} ({len(totals)} tenants)")
+
+    async def stop(self):
+        """Flush remaining spend and close the database"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+        await self._run(self._db.close)
+        self._executor.shutdown(wait=True)
+
+    def record(self, tenant: str, cost: float) -> bool:
+        """Add spend for a tenant and return whether it is still within budget"""
+        spend = self._tenants.get(tenant)
+        if spend is None:
+            spend = self._tenants[tenant] = TenantSpend()
+        spend.pending += cost
+        spend.pending_responses += 1
+        return not self._over_budget(tenant, spend)
+
+    def is_over_budget(self, tenant: str) -> bool:
+        """Check whether a tenant has already spent its budget"""
+        spend = self._tenants.get(tenant)
+        return spend is not None and self._over_budget(tenant, spend)
+
+    def budget_for(self, tenant: str) -> Optional[float]:
+        return self.budgets.get(tenant, self.default_budget)
+
+    async def flush(self):
+        """Write pending spend and refresh host-wide totals"""
+        deltas = []
+        for tenant, spend in self._tenants.items():
+            if spend.pending or spend.pending_responses:
+                deltas.append((tenant, spend.pending, spend.pending_responses))
+                spend.in_flight += spend.pending
+                spend.pending = 0.0
+                spend.pending_responses = 0
+
+        try:
+            totals = await self._run(self._write, deltas)
+        except sqlite3.Error as e:
+            logger.error(f"Cost ledger flush failed: {e}")
+            # Keep the spend so the next flush retries it
+            for tenant, cost, responses in deltas:
+                spend = self._tenants[tenant]
+                spend.in_flight -= cost
+                spend.pending += cost
+                spend.pending_responses += responses
+            return
+
+        for tenant, cost, _ in deltas:
+            self._tenants[tenant].in_flight -= cost
+        self._apply_totals(totals)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get running spend and budget for every known tenant"""
+        return {
+            tenant: {"total": round(spend.total, 6), "budget": self.budget_for(tenant)}
+            for tenant, spend in self._tenants.items()
+        }
+
+    def _over_budget(self, tenant: str, spend: TenantSpend) -> bool:
+        budget = self.budget_for(tenant)
+        return budget is not None and spend.total > budget
+
+    def _apply_totals(self, totals: Dict[str, float]):
+        for tenant, cost in totals.items():
+            spend = self._tenants.get(tenant)
+            if spend is None:
+                spend = self._tenants[tenant] = TenantSpend()
+            spend.persisted = cost
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _open(self) -> Dict[str, float]:
+        self._db = sqlite3.connect(self.path, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(_SCHEMA)
+        self._db.commit()
+        return self._read_totals()
+
+    def _write(self, deltas) -> Dict[str, float]:
+        if deltas:
+            now = time.time()
+            self._db.executemany(_UPSERT, [(tenant, cost, responses, now) for tenant, cost, responses in deltas])
+            self._db.commit()
+        return self._read_totals()
+
+    def _read_totals(self) -> Dict[str, float]:
+        return dict(self._db.execute("SELECT tenant, cost FROM tenant_spend").fetchall())
@@ -0,0 +1,146 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, Dict, Any, List
+
+
+class LazyJson:
+    """Serialize a payload only when the log record is actually formatted"""
+
+    __slots__ = ("value", "indent")
+
+    def __init__(self, value: Any, indent: Optional[int] = None):
+        self.value = value
+        self.indent = indent
+
+    def __str__(self) -> str:
+        return json.dumps(self.value, indent=self.indent)
+
+
+class LazyPreview:
+    """Truncate long text only when the log record is actually formatted"""
+
+    __slots__ = ("text", "limit")
+
+    def __init__(self, text: str, limit: int = 100):
+        self.text = text
+        self.limit = limit
+
+    def __str__(self) -> str:
+        return self.text[:self.limit] + "..." if len(self.text) > self.limit else self.text
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """Parse "response.done=0.1,session.update=0.5" into a rate per event type"""
+    rates = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        event_type, _, rate = entry.partition("=")
+        rates[event_type.strip()] = float(rate)
+    return rates
+
+
+class EventSampler(logging.Filter):
+    """Per-event-type sampling and rate limiting of log records
+
+    Records logged with extra={"event_type": ...} are kept with the
+    configured probability and then limited to rate_limit records per
+    second per event type. Other records always pass.
+    """
+
+    def __init__(self, sample_rates: Dict[str, float], rate_limit: float = 0.0):
+        super().__init__()
+        self.sample_rates = sample_rates
+        self.rate_limit = rate_limit
+        self.sampled_out = 0
+        self.rate_limited = 0
+        # event type -> [tokens, last refill time]
+        self._buckets: Dict[str, List[float]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        event_type = getattr(record, "event_type", None)
+        if event_type is None:
+            return True
+
+        rate = self.sample_rates.get(event_type, 1.0)
+        if rate < 1.0 and random.random() >= rate:
+            self.sampled_out += 1
+            return False
+
+        if self.rate_limit > 0:
+            now = time.monotonic()
+            bucket = self._buckets.get(event_type)
+            if bucket is None:
+                bucket = self._buckets[event_type] = [self.rate_limit, now]
+            bucket[0] = min(self.rate_limit, bucket[0] + (now - bucket[1]) * self.rate_limit)
+            bucket[1] = now
+            if bucket[0] < 1:
+                self.rate_limited += 1
+                return False
+            bucket[0] -= 1
+
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Queue handler that never formats or blocks on the caller's thread"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting, including lazy payloads, happens on the listener thread
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """Route all application logging through a queue and a writer thread"""
+
+    def __init__(
+        self,
+        level: str = "INFO",
+        queue_size: int = 10000,
+        sample_rates: Optional[Dict[str, float]] = None,
+        rate_limit: float = 0.0
+    ):
+        self.level = level
+        self.sampler = EventSampler(sample_rates or {}, rate_limit)
+        self.handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+        self.handler.addFilter(self.sampler)
+        output = logging.StreamHandler()
+        output.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+        self.listener = QueueListener(self.handler.queue, output, respect_handler_level=True)
+        self._running = False
+
+    def start(self):
+        """Install the queue handler on the root logger and start the writer"""
+        root = logging.getLogger()
+        root.handlers = [self.handler]
+        root.setLevel(self.level)
+        self.listener.start()
+        self._running = True
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Flush pending records and stop the writer thread"""
+        if self._running:
+            self._running = False
+            self.listener.stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get counters for records that were not written"""
+        return {
+            "dropped": self.handler.dropped,
+            "sampledOut": self.sampler.sampled_out,
+            "rateLimited": self.sampler.rate_limited
+        }
@@ -0,0 +1,108 @@
+from array import array
+from bisect import bisect_left
+from typing import Optional, Dict, List, Tuple, Sequence, Union
+
+# Latency buckets in seconds, shared by the relay histograms
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Client-supplied event types are unbounded, so cap the label cardinality
+MAX_EVENT_SERIES = 256
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    """Fixed-bucket histogram backed by flat arrays instead of per-event objects"""
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        # One slot per bucket plus the +Inf overflow slot
+        self.counts = array("Q", [0] * (len(self.buckets) + 1))
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """Record one observation"""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def render(self) -> List[str]:
+        """Render in Prometheus text exposition format"""
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram"
+        ]
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        cumulative += self.counts[-1]
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {cumulative}')
+        lines.append(f"{self.name}_sum {self.sum}")
+        lines.append(f"{self.name}_count {cumulative}")
+        return lines
+
+
+class RelayMetrics:
+    """Process-wide relay instrumentation exposed on /metrics"""
+
+    def __init__(self):
+        self.upstream_connect = Histogram(
+            "relay_upstream_connect_seconds",
+            "Time to establish or acquire the OpenAI Realtime connection"
+        )
+        self.client_send = Histogram(
+            "relay_client_send_seconds",
+            "Time spent sending one message to the client WebSocket"
+        )
+        self.speech_to_first_audio = Histogram(
+            "relay_speech_stopped_to_first_audio_seconds",
+            "Time from input_audio_buffer.speech_stopped to the first response.audio.delta"
+        )
+        # (direction, event type) -> [messages, bytes]
+        self._events: Dict[Tuple[str, str], List[int]] = {}
+
+    def count_event(self, direction: str, event_type: str, size: int):
+        """Count one message and its size for an event type"""
+        counters = self._events.get((direction, event_type))
+        if counters is None:
+            if len(self._events) >= MAX_EVENT_SERIES:
+                event_type = "other"
+            counters = self._events.setdefault((direction, event_type), [0, 0])
+        counters[0] += 1
+        counters[1] += size
+
+    def render(
+        self,
+        gauges: Dict[str, Union[int, float]],
+        counters: Optional[Dict[str, Union[int, float]]] = None
+    ) -> str:
+        """Render all metrics plus externally tracked values in Prometheus format"""
+        lines: List[str] = []
+        for histogram in (self.upstream_connect, self.client_send, self.speech_to_first_audio):
+            lines.extend(histogram.render())
+
+        lines.append("# HELP relay_events_total Messages relayed per direction and event type")
+        lines.append("# TYPE relay_events_total counter")
+        for (direction, event_type), (messages, _) in sorted(self._events.items()):
+            lines.append(f'relay_events_total{{direction="{direction}",type="{_escape_label(event_type)}"}} {messages}')
+
+        lines.append("# HELP relay_event_bytes_total Bytes relayed per direction and event type")
+        lines.append("# TYPE relay_event_bytes_total counter")
+        for (direction, event_type), (_, size) in sorted(self._events.items()):
+            lines.append(f'relay_event_bytes_total{{direction="{direction}",type="{_escape_label(event_type)}"}} {size}')
+
+        for name, value in gauges.items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        for name, value in (counters or {}).items():
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
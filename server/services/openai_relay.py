@@ -1,24 +1,225 @@
 import asyncio
+import base64
 import json
 import logging
+import random
+import re
+import time
 import websockets
-from typing import Optional, Dict, Any, Callable
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Callable, Awaitable, Union, Deque, Set
 from websockets.exceptions import ConnectionClosed, WebSocketException
 
+from models.audio import BYTES_PER_MS
 from models.cost import SessionCostTracker
-from models.websocket import MessageType
+from models.websocket import MessageType, ErrorMessage, ConnectionMessage
+from services.audio_coalescer import AudioCoalescer, CoalescerStats
+from services.audio_reframer import AudioReframer, ReframerStats
+from services.metrics import RelayMetrics
+from services.log_pipeline import LazyJson
+from services.response_cache import ResponseCache, ResponseRecording, CachedResponse
+from services.upstream_buffer import UpstreamBuffer, ResumeStats
+from services.transcript_hub import TRANSCRIPT_EVENT_TYPES
+from services.tool_registry import ToolRegistry
+from services.outbound_queue import estimate_audio_ms
 
 logger = logging.getLogger(__name__)
 
+OPENAI_REALTIME_URL = "wss://api.openai.com/v1/realtime?model=gpt-realtime"
+
+# Event types the relay acts on; everything else is forwarded to the client
+# exactly as received without being decoded.
+DECODED_EVENT_TYPES = frozenset({
+    MessageType.ERROR.value,
+    MessageType.SESSION_CREATED.value,
+    MessageType.RESPONSE_DONE.value,
+    MessageType.RESPONSE_FUNCTION_CALL_ARGUMENTS_DONE.value,
+})
+
+# OpenAI serializes the event type as the first key of every server event, so
+# anchoring at the start of the frame guarantees we read the top-level type.
+_EVENT_TYPE_PATTERN = re.compile(r'\s*\{\s*"type"\s*:\s*"([^"\\]*)"')
+
+# Upstream events whose content is kept to rebuild the conversation after a reconnect
+HISTORY_EVENT_TYPES = frozenset({
+    "conversation.item.input_audio_transcription.completed",
+    "response.audio_transcript.done",
+    "response.text.done",
+})
+
+# Upstream events that track the playing response for barge-in
+BARGE_IN_EVENT_TYPES = frozenset({
+    MessageType.RESPONSE_CREATED.value,
+    "response.output_item.added",
+    MessageType.RESPONSE_DONE.value,
+    MessageType.INPUT_AUDIO_BUFFER_SPEECH_STARTED.value,
+})
+
+# Upstream events that end a response's re-framed output audio
+OUTPUT_FLUSH_EVENT_TYPES = frozenset({
+    "response.audio.done",
+    MessageType.RESPONSE_DONE.value,
+})
+
+# Full-jitter exponential backoff between reconnect attempts
+RESUME_BACKOFF_BASE_SECONDS = 0.1
+RESUME_BACKOFF_MAX_SECONDS = 5.0
+
+
+@dataclass
+class BargeInStats:
+    interruptions: int = 0
+    dropped_audio_ms: float = 0.0
+    discarded_deltas: int = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get how often callers interrupted and how much audio was not sent"""
+        return {
+            "interruptions": self.interruptions,
+            "droppedAudioMs": round(self.dropped_audio_ms, 1),
+            "discardedDeltas": self.discarded_deltas
+        }
+
+
+def peek_event_type(raw: Union[str, bytes]) -> Optional[str]:
+    """Read the top-level event type from a raw frame without decoding it"""
+    if isinstance(raw, bytes):
+        raw = raw[:128].decode("utf-8", errors="ignore")
+    match = _EVENT_TYPE_PATTERN.match(raw)
+    return match.group(1) if match else None
+
+
+async def connect_realtime(api_key: str, url: str = OPENAI_REALTIME_URL) -> websockets.WebSocketClientProtocol:
+    """Open an authenticated WebSocket to the OpenAI Realtime API"""
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "OpenAI-Beta": "realtime=v1"
+    }
+    # Keepalive pings come from the shared TimerWheel instead of a task per socket,
+    # or from the connection pool's refill loop while the socket sits idle there
+    return await websockets.connect(url, extra_headers=headers, ping_interval=None)
+
 
 class OpenAIRelay:
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        url: str = OPENAI_REALTIME_URL,
+        binary_audio: bool = False,
+        coalesce_window_ms: int = 0,
+        coalesce_max_ms: int = 500,
+        coalesce_stats: Optional[CoalescerStats] = None,
+        output_frame_ms: int = 0,
+        output_min_lead_ms: float = 80.0,
+        output_max_lead_ms: float = 400.0,
+        reframer_stats: Optional[ReframerStats] = None,
+        connection_pool=None,
+        cost_listener: Optional[Callable[[SessionCostTracker], None]] = None,
+        budget_check: Optional[Callable[[SessionCostTracker, float], bool]] = None,
+        metrics: Optional[RelayMetrics] = None,
+        silence_suppressor=None,
+        recorder=None,
+        tracer=None,
+        response_cache: Optional[ResponseCache] = None,
+        transcoder=None,
+        transcript=None,
+        tool_registry: Optional[ToolRegistry] = None,
+        barge_in: bool = False,
+        flush_output_audio: Optional[Callable[[], float]] = None,
+        barge_in_stats: Optional[BargeInStats] = None,
+        resume_attempts: int = 0,
+        resume_history_items: int = 20,
+        resume_buffer_ms: float = 2000.0,
+        resume_stats: Optional[ResumeStats] = None
+    ):
         self.api_key = api_key
+        self.url = url
+        # Optional RealtimeConnectionPool to take pre-dialed connections from
+        self.connection_pool = connection_pool
+        # When set, audio travels as raw PCM16 bytes on the client leg and is
+        # only base64/JSON encoded on the upstream leg
+        self.binary_audio = binary_audio
+        # Optional CallRecorder tapping input and output audio
+        self.recorder = recorder
+        # Optional TraceRecorder capturing every upstream frame for replay
+        self.tracer = tracer
+        # Optional Transcoder for client legs that are not 24 kHz PCM16
+        self.transcoder = transcoder
+        # Optional SessionTranscript assembling transcript deltas for observers
+        self.transcript = transcript
+        # Optional ToolRegistry whose function calls the relay answers itself
+        self.tool_registry = tool_registry
+        self._tool_tasks: Set[asyncio.Task] = set()
+        self._tools_called = False
+        self._tool_response_due = False
+        # Optional SilenceSuppressor that drops silent input audio
+        self.silence_suppressor = silence_suppressor
+        # Merges consecutive input audio chunks into fewer upstream frames
+        self.audio_coalescer: Optional[AudioCoalescer] = None
+        if coalesce_window_ms > 0:
+            self.audio_coalescer = AudioCoalescer(
+                self._send_audio_frame,
+                coalesce_window_ms,
+                coalesce_max_ms,
+                stats=coalesce_stats
+            )
+        # Re-frames output audio into fixed-duration chunks paced to the client
+        self.output_reframer: Optional[AudioReframer] = None
+        self._output_audio_fields: Dict[str, Any] = {}
+        if output_frame_ms > 0:
+            self.output_reframer = AudioReframer(
+                self._emit_output_audio,
+                output_frame_ms,
+                min_lead_ms=output_min_lead_ms,
+                max_lead_ms=output_max_lead_ms,
+                stats=reframer_stats
+            )
         self.websocket: Optional[websockets.WebSocketServerProtocol] = None
-        self.message_queue = asyncio.Queue()
+        # Reconnection after an unexpected close (0 attempts disables it);
+        # frames sent during the outage wait in a buffer capped by audio duration
+        self.resume_attempts = resume_attempts
+        self.resume_stats = resume_stats or ResumeStats()
+        self.message_queue = UpstreamBuffer(resume_buffer_ms, stats=self.resume_stats)
+        self.history: Optional[Deque[Dict[str, Any]]] = deque(maxlen=resume_history_items) if resume_attempts > 0 else None
+        self.is_resuming = False
+        self._session_started = False
+        self._resumed = False
         self.cost_tracker = SessionCostTracker()
+        # Called after every cost update, e.g. for host-wide accounting
+        self.cost_listener = cost_listener
+        # Records each response's spend and returns False once a budget is exceeded
+        self.budget_check = budget_check
         self.is_connecting = False
         self.is_intentional_disconnect = False
+        # Monotonic time of the last upstream frame, for keepalive decisions
+        self.last_activity = time.monotonic()
+        # Instrumentation is skipped entirely when metrics is None
+        self.metrics = metrics
+        self._speech_stopped_at: Optional[float] = None
+        # Optional ResponseCache serving responses that are fully determined
+        # by the session config, i.e. requested before any conversation items
+        self.response_cache = response_cache
+        self._session_config: Optional[Dict[str, Any]] = None
+        self._conversation_started = False
+        self._pending_cache_key: Optional[str] = None
+        self._cache_recording: Optional[ResponseRecording] = None
+        self._replay_task: Optional[asyncio.Task] = None
+        self._message_handler: Optional[Callable] = None
+        # Reads upstream frames; owned by the relay so every connection gets a reader
+        self._listener: Optional[asyncio.Task] = None
+        # Barge-in: when the caller starts speaking over a response, drop the
+        # audio still queued for the client (flush_output_audio returns how
+        # many ms it dropped) and cancel and truncate the response upstream
+        self.barge_in = barge_in
+        self.flush_output_audio = flush_output_audio
+        self.barge_in_stats = barge_in_stats or BargeInStats()
+        self._response_active = False
+        self._audio_item_id: Optional[str] = None
+        self._response_audio_ms = 0.0
+        self._first_audio_at: Optional[float] = None
+        self._discard_audio = False
+        self._cancel_pending = False
         
     async def connect(self):
         """Establish connection to OpenAI Realtime API"""
@@ -26,29 +227,54 @@ class OpenAIRelay:
             return
             
         self.is_connecting = True
+        websocket = None
         try:
-            url = "wss://api.openai.com/v1/realtime?model=gpt-realtime"
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "OpenAI-Beta": "realtime=v1"
-            }
-            
-            self.websocket = await websockets.connect(url, extra_headers=headers)
-            self.is_connecting = False
+            started_at = time.perf_counter()
+            if self.connection_pool:
+                websocket = await self.connection_pool.acquire()
+            else:
+                websocket = await connect_realtime(self.api_key, self.url)
+            if self.metrics:
+                self.metrics.upstream_connect.observe(time.perf_counter() - started_at)
             self.is_intentional_disconnect = False
             logger.info("Connected to OpenAI Realtime API")
             
-            # Process any queued messages
-            await self._process_queued_messages()
+            # Restore the previous session, then send what was queued meanwhile.
+            # Other senders keep queueing until the socket is published below,
+            # so nothing overtakes the restored config or the buffered audio
+            await self._restore_session(websocket)
+            await self._process_queued_messages(websocket)
+            self.websocket = websocket
+            self.is_connecting = False
+            # A listener that gave up on an earlier connection has exited
+            self._start_listener()
             
         except Exception as e:
             self.is_connecting = False
+            if websocket is not None and websocket is not self.websocket:
+                await websocket.close()
             logger.error(f"Failed to connect to OpenAI: {e}")
             raise
     
     async def disconnect(self, intentional: bool = False):
         """Close connection to OpenAI API"""
         self.is_intentional_disconnect = intentional
+        if intentional:
+            # The next connection starts a fresh conversation
+            self._session_started = False
+            self.message_queue.clear()
+            if self.history is not None:
+                self.history.clear()
+            for task in self._tool_tasks:
+                task.cancel()
+            self.stop_listening()
+        if self._replay_task:
+            self._replay_task.cancel()
+            self._replay_task = None
+        if self.audio_coalescer:
+            self.audio_coalescer.close()
+        if self.output_reframer:
+            self.output_reframer.close()
         if self.websocket and not self.websocket.closed:
             await self.websocket.close()
             logger.info("Disconnected from OpenAI Realtime API")
@@ -56,86 +282,614 @@ class OpenAIRelay:
     
     async def send_message(self, message: str):
         """Send message to OpenAI API, queue if not connected"""
+        if self.audio_coalescer:
+            # Flush pending audio first so control events keep their order
+            await self.audio_coalescer.flush()
+        await self._send_upstream(message)
+    
+    async def _send_upstream(self, message: str, audio_ms: Optional[float] = None):
+        """Send a frame upstream, queueing it while not connected"""
         if self.websocket and not self.websocket.closed:
             await self.websocket.send(message)
-        elif not self.is_connecting:
-            # Queue message if we're not connected and not currently connecting
+            return
+        
+        if not self.is_connecting and not self.is_resuming:
             logger.info("Queueing message while establishing OpenAI connection")
-            await self.message_queue.put(message)
+        if audio_ms is None and peek_event_type(message) == MessageType.INPUT_AUDIO_BUFFER_APPEND.value:
+            audio_ms = estimate_audio_ms(message)
+        self.message_queue.put(message, audio_ms)
+    
+    async def send_audio(self, pcm: bytes):
+        """Append client audio to the upstream input audio buffer"""
+        if self.transcoder:
+            pcm = self.transcoder.decode(pcm)
+        if self.recorder:
+            self.recorder.record_input(pcm)
+        
+        if self.silence_suppressor:
+            chunks = self.silence_suppressor.process(pcm)
+            self.cost_tracker.audio_seconds_saved = self.silence_suppressor.audio_seconds_saved
         else:
-            # Queue if we're connecting
-            await self.message_queue.put(message)
+            chunks = [pcm]
+        
+        for chunk in chunks:
+            if self.audio_coalescer:
+                await self.audio_coalescer.add(chunk)
+            else:
+                await self._send_audio_frame(chunk)
+    
+    @property
+    def processes_input_audio(self) -> bool:
+        """Whether input audio must be decoded to go through relay stages"""
+        return (
+            self.silence_suppressor is not None
+            or self.transcoder is not None
+            or self.audio_coalescer is not None
+            or self.recorder is not None
+        )
     
-    async def _process_queued_messages(self):
-        """Process all queued messages once connected"""
-        message_count = self.message_queue.qsize()
-        logger.info(f"Processing {message_count} queued messages")
+    async def _send_audio_frame(self, pcm: bytes):
+        """Wrap PCM16 audio in an input_audio_buffer.append event"""
+        message = json.dumps({
+            "type": MessageType.INPUT_AUDIO_BUFFER_APPEND.value,
+            "audio": base64.b64encode(pcm).decode("ascii")
+        })
+        await self._send_upstream(message, len(pcm) / BYTES_PER_MS)
+    
+    def note_client_event(self, message_type: Optional[str], message: Dict[str, Any]):
+        """Track the client events that decide whether a response is cacheable"""
+        if message_type == MessageType.SESSION_UPDATE.value:
+            # Updates are partial; the session is the sum of all of them
+            self._session_config = {**(self._session_config or {}), **(message.get("session") or {})}
+        elif message_type == "conversation.item.create":
+            self._start_conversation()
+            if message.get("item"):
+                self._remember_item(message["item"])
+        elif message_type == "input_audio_buffer.commit":
+            self._start_conversation()
+        elif message_type == "response.cancel" and self.output_reframer:
+            # Audio of a cancelled response is not worth sending
+            self.output_reframer.drop()
+    
+    async def create_response(self, message: str, request: Dict[str, Any]):
+        """Request a response, replaying it from the response cache when possible"""
+        if self.response_cache and not self._conversation_started and self._message_handler:
+            key = self.response_cache.key(self.url, self._session_config, request.get("response"))
+            cached = await self.response_cache.get(key)
+            if cached:
+                logger.info("Replaying cached response", extra={"event_type": MessageType.RESPONSE_CREATE.value})
+                self._conversation_started = True
+                self._replay_task = asyncio.create_task(self._replay_cached(cached, self._client_handler()))
+                return
+            self._pending_cache_key = key
+        await self.send_message(message)
+    
+    def cancel_replay(self) -> bool:
+        """Stop a cached response that is still playing"""
+        if self._replay_task and not self._replay_task.done():
+            self._replay_task.cancel()
+            return True
+        return False
+    
+    async def _replay_cached(self, cached: CachedResponse, message_handler: Callable):
+        """Play recorded upstream frames back to the client with their original pacing"""
+        started_at = time.monotonic()
+        transcript = cached.transcript
+        played = []
+        try:
+            for offset, event_type, frame in cached.frames:
+                delay = offset - (time.monotonic() - started_at)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await self._forward_event(frame, event_type, message_handler)
+                if event_type == "response.audio_transcript.delta":
+                    played.append(json.loads(frame).get("delta", ""))
+        except asyncio.CancelledError:
+            if self._replay_task is not asyncio.current_task():
+                # Dropped by disconnect(); the conversation is over
+                return
+            # Interrupted: only what was sent before the cancel was heard
+            transcript = "".join(played)
         
-        while not self.message_queue.empty() and self.websocket and not self.websocket.closed:
-            message = await self.message_queue.get()
-            await self.websocket.send(message)
+        # Keep the model's view of the conversation in line with what the client heard
+        if transcript:
+            item = {
+                "type": "message",
+                "role": "assistant",
+                "content": [{"type": "text", "text": transcript}]
+            }
+            self._remember_item(item)
+            await self.send_message(json.dumps({"type": "conversation.item.create", "item": item}))
     
-    async def listen_for_messages(self, message_handler: Callable[[Dict[str, Any]], None]):
-        """Listen for messages from OpenAI and handle them"""
-        if not self.websocket:
-            raise RuntimeError("Not connected to OpenAI API")
+    def _start_conversation(self):
+        """Responses depend on the conversation from now on"""
+        self._conversation_started = True
+        if self._cache_recording is None:
+            # A requested response that has not started would see this context too
+            self._pending_cache_key = None
+    
+    def _capture_for_cache(self, event_type: Optional[str], message: str):
+        """Record the response requested on a cache miss"""
+        if event_type in ("conversation.item.created", "input_audio_buffer.committed"):
+            self._start_conversation()
+        
+        if self._cache_recording is None:
+            if not (self._pending_cache_key and event_type == MessageType.RESPONSE_CREATED.value):
+                return
+            self._cache_recording = ResponseRecording(self._pending_cache_key)
+            self._pending_cache_key = None
+        
+        if event_type and event_type.startswith("response."):
+            recording = self._cache_recording
+            recording.add(event_type, message)
+            if event_type == MessageType.RESPONSE_DONE.value:
+                self._cache_recording = None
+                if recording.status == "completed":
+                    self.response_cache.put(recording.key, recording.finish())
+    
+    async def _process_queued_messages(self, websocket):
+        """Send everything queued, including frames queued while sending"""
+        messages = self.message_queue.drain()
+        logger.info(f"Processing {len(messages)} queued messages")
         
+        while messages:
+            for message in messages:
+                await websocket.send(message)
+            messages = self.message_queue.drain()
+    
+    async def _restore_session(self, websocket):
+        """Replay the session config and recent conversation on a new connection"""
+        if not self._session_started:
+            return
+        self._resumed = True
+        if self._session_config is not None:
+            await websocket.send(json.dumps({"type": "session.update", "session": self._session_config}))
+        for item in self.history or ():
+            await websocket.send(json.dumps({"type": "conversation.item.create", "item": item}))
+        logger.info(f"Restored session with {len(self.history or ())} conversation items")
+    
+    async def _resume(self, message_handler: Callable) -> bool:
+        """Reconnect after an unexpected close, backing off with jitter"""
+        if self.is_intentional_disconnect or self.resume_attempts <= 0:
+            return False
+        
+        self.is_resuming = True
         try:
-            async for message in self.websocket:
-                try:
-                    data = json.loads(message)
-                    await self._handle_openai_message(data, message_handler)
-                except json.JSONDecodeError as e:
-                    logger.error(f"Error parsing OpenAI message: {e}")
-                    # Still forward the raw message
-                    await message_handler({"type": "raw", "data": message})
-        except ConnectionClosed:
-            logger.info("OpenAI WebSocket connection closed")
-        except WebSocketException as e:
-            logger.error(f"OpenAI WebSocket error: {e}")
+            for attempt in range(self.resume_attempts):
+                delay = min(RESUME_BACKOFF_MAX_SECONDS, RESUME_BACKOFF_BASE_SECONDS * 2 ** attempt)
+                await asyncio.sleep(random.uniform(0, delay))
+                if self.is_intentional_disconnect:
+                    return False
+                if not self.is_connected:
+                    try:
+                        await self.connect()
+                    except Exception:
+                        continue
+                if self.is_connected:
+                    self.resume_stats.reconnects += 1
+                    logger.info(f"Resumed OpenAI session after {attempt + 1} attempt(s)")
+                    return True
         finally:
-            self.websocket = None
+            self.is_resuming = False
+        
+        self.resume_stats.failed_reconnects += 1
+        self.message_queue.clear()
+        logger.error(f"Giving up on OpenAI connection after {self.resume_attempts} attempts")
+        closed_msg = ConnectionMessage(
+            type=MessageType.CONNECTION_CLOSED,
+            message="OpenAI connection lost"
+        )
+        await message_handler(closed_msg.model_dump(exclude_none=True), MessageType.CONNECTION_CLOSED.value)
+        return False
+    
+    def _remember_item(self, item: Dict[str, Any]):
+        if self.history is not None:
+            self.history.append(item)
+    
+    def _record_history(self, event_type: str, message: str):
+        """Keep finished transcripts as items to replay after a reconnect"""
+        event = json.loads(message)
+        if event_type == "conversation.item.input_audio_transcription.completed":
+            role, content_type, text = "user", "input_text", event.get("transcript")
+        elif event_type == "response.audio_transcript.done":
+            role, content_type, text = "assistant", "text", event.get("transcript")
+        else:
+            role, content_type, text = "assistant", "text", event.get("text")
+        if text:
+            self._remember_item({"type": "message", "role": role, "content": [{"type": content_type, "text": text}]})
+    
+    def listen_for_messages(self, message_handler: Callable[[Union[Dict[str, Any], str, bytes], Optional[str]], Awaitable[None]]):
+        """Start handing messages from OpenAI to message_handler
+        
+        Only the event types in DECODED_EVENT_TYPES are parsed; all other
+        frames are handed to message_handler as the original raw string, or
+        as raw PCM16 bytes for audio deltas in binary audio mode. The event
+        type is passed alongside so the handler never has to decode it.
+        Frames are read by a background task that continues across resumed
+        connections and is restarted by any later connect().
+        """
+        if not self.websocket:
+            raise RuntimeError("Not connected to OpenAI API")
+        
+        self._message_handler = message_handler
+        self._start_listener()
+    
+    def stop_listening(self):
+        """Stop reading from OpenAI, e.g. when the client goes away"""
+        if self._listener is not None and self._listener is not asyncio.current_task():
+            self._listener.cancel()
+        self._listener = None
+    
+    def _start_listener(self):
+        if self._message_handler and self.websocket and (self._listener is None or self._listener.done()):
+            self._listener = asyncio.create_task(self._listen(self._client_handler()))
+    
+    def _client_handler(self) -> Callable:
+        """Handler for client-bound events, kept behind re-framed audio still playing out"""
+        return self._send_after_audio if self.output_reframer else self._message_handler
+    
+    async def _send_after_audio(self, message, event_type: Optional[str] = None):
+        if self.output_reframer.holding:
+            self.output_reframer.hold(lambda: self._message_handler(message, event_type))
+        else:
+            await self._message_handler(message, event_type)
+    
+    async def _listen(self, message_handler: Callable):
+        while True:
+            try:
+                async for message in self.websocket:
+                    self.last_activity = time.monotonic()
+                    if self.tracer:
+                        self.tracer.record_upstream(message)
+                    await self._handle_upstream_frame(message, message_handler)
+            except ConnectionClosed:
+                logger.info("OpenAI WebSocket connection closed")
+            except WebSocketException as e:
+                logger.error(f"OpenAI WebSocket error: {e}")
+            except Exception as e:
+                logger.error(f"Error relaying OpenAI messages: {e}")
+                await self.disconnect()
+                return
+            finally:
+                self.websocket = None
+
+            # Unexpected closes are resumed on a new connection
+            if not await self._resume(message_handler):
+                return
+    
+    async def _handle_upstream_frame(self, message: str, message_handler: Callable):
+        """Run the relay stages for one upstream frame and hand it to the client"""
+        data = None
+        event_type = peek_event_type(message)
+        if event_type is None:
+            # "type" is not the first key, so the fast path cannot see it; decode
+            # once and let the frame through the same stages
+            try:
+                data = json.loads(message)
+            except json.JSONDecodeError as e:
+                logger.error(f"Error parsing OpenAI message: {e}")
+                # Still forward the raw message
+                await message_handler({"type": "raw", "data": message}, "raw")
+                return
+            event_type = data.get("type") if isinstance(data, dict) else None
+        
+        if self.metrics:
+            self._record_upstream_event(event_type, message)
+        if self.response_cache:
+            self._capture_for_cache(event_type, message)
+        if self.history is not None and event_type in HISTORY_EVENT_TYPES:
+            self._record_history(event_type, message)
+        if self.barge_in and event_type in BARGE_IN_EVENT_TYPES:
+            await self._track_response(event_type, message)
+        if event_type is not None and event_type not in DECODED_EVENT_TYPES:
+            self._log_passthrough_event(event_type)
+            await self._forward_event(message, event_type, message_handler)
+            return
+        if data is None:
+            try:
+                data = json.loads(message)
+            except json.JSONDecodeError as e:
+                logger.error(f"Error parsing OpenAI message: {e}")
+                await message_handler({"type": "raw", "data": message}, "raw")
+                return
+        await self._handle_openai_message(data, message_handler)
     
     async def _handle_openai_message(self, message: Dict[str, Any], message_handler: Callable):
         """Handle specific OpenAI message types"""
         message_type = message.get("type")
         
+        # Payloads are rendered lazily, only for records the log pipeline keeps
+        log_extra = {"event_type": message_type}
+        over_budget = False
         if message_type == "error":
-            logger.error(f"OpenAI Error: {message}")
+            if self._cancel_pending and message.get("error", {}).get("code") == "response_cancel_not_active":
+                # The response finished before our barge-in cancel reached it
+                self._cancel_pending = False
+                return
+            logger.error("OpenAI Error: %s", message, extra=log_extra)
         elif message_type == "session.created":
-            logger.info(f"🔧 Session Created - Model: {message.get('session', {}).get('model', 'Unknown')}")
-            logger.info(f"🔧 Session ID: {message.get('session', {}).get('id', 'Unknown')}")
-            logger.info(f"🔧 Full Session Info: {json.dumps(message.get('session'), indent=2)}")
+            session = message.get("session", {})
+            logger.info("🔧 Session Created - Model: %s", session.get("model", "Unknown"), extra=log_extra)
+            logger.info("🔧 Session ID: %s", session.get("id", "Unknown"), extra=log_extra)
+            logger.info("🔧 Full Session Info: %s", LazyJson(session, indent=2), extra=log_extra)
             
-            # Reset cost tracking for new session
-            self.cost_tracker.reset()
-            logger.info("💰 Cost tracking reset for new session")
+            if self._resumed:
+                # Same call on a new upstream session: keep the running cost
+                self._resumed = False
+                self.cost_tracker.resume()
+                logger.info("💰 Cost tracking carried over to resumed session", extra=log_extra)
+            else:
+                # Reset cost tracking for new session
+                self.cost_tracker.reset()
+                logger.info("💰 Cost tracking reset for new session", extra=log_extra)
+            self._session_started = True
+            if self.tool_registry:
+                await self._send_upstream(json.dumps({
+                    "type": "session.update",
+                    "session": {"tools": self._session_tools(self._session_config)}
+                }))
+            
+        elif message_type == MessageType.RESPONSE_FUNCTION_CALL_ARGUMENTS_DONE.value:
+            if self.tool_registry and self.tool_registry.has(message.get("name")):
+                logger.info("🔧 Running tool %s", message.get("name"), extra=log_extra)
+                self._tools_called = True
+                task = asyncio.create_task(self._run_tool(message))
+                self._tool_tasks.add(task)
             
         elif message_type == "response.done":
-            logger.info(f"✅ Response Done - Usage: {json.dumps(message.get('response', {}).get('usage'), indent=2)}")
+            if self.output_reframer:
+                self.output_reframer.end_response()
+            logger.info(
+                "✅ Response Done - Usage: %s",
+                LazyJson(message.get("response", {}).get("usage"), indent=2),
+                extra=log_extra
+            )
             
             # Calculate and track cost
             response_usage = message.get("response", {}).get("usage")
             if response_usage:
                 incremental_cost = self.cost_tracker.update_from_usage(response_usage)
-                logger.info(f"💰 Cost Update - Incremental: ${incremental_cost:.6f}, Total: ${self.cost_tracker.session_cost:.6f}")
+                logger.info(
+                    "💰 Cost Update - Incremental: $%.6f, Total: $%.6f",
+                    incremental_cost,
+                    self.cost_tracker.session_cost,
+                    extra=log_extra
+                )
+                if self.cost_listener:
+                    self.cost_listener(self.cost_tracker)
+                if self.budget_check:
+                    over_budget = not self.budget_check(self.cost_tracker, incremental_cost)
                 
                 # Send cost update through handler
                 cost_update = {
                     "type": "cost.update",
                     "cost": self.cost_tracker.get_cost_data()
                 }
-                await message_handler(cost_update)
-            
-            logger.info(f"OpenAI Event: {message_type}")
+                await message_handler(cost_update, MessageType.COST_UPDATE.value)
             
-        elif message_type == "conversation.item.created":
-            logger.info(f"OpenAI Event: {message_type}")
-        elif message_type == "response.created":
-            logger.info(f"🎯 Response Created - Model: {message.get('response', {}).get('model', 'Unknown')}")
+            logger.info("OpenAI Event: %s", message_type, extra=log_extra)
+        else:
+            self._log_passthrough_event(message_type)
         
         # Forward all messages to client
-        await message_handler(message)
+        await message_handler(message, message_type)
+        
+        if over_budget:
+            await self._stop_for_budget(message_handler)
+        elif message_type == MessageType.RESPONSE_DONE.value and self._tools_called:
+            # Continue once every tool call of this response has its output. A
+            # cancelled response means the caller spoke; their turn answers it.
+            self._tools_called = False
+            self._tool_response_due = message.get("response", {}).get("status") != "cancelled"
+            await self._request_tool_response()
+    
+    def add_server_tools(self, message: Dict[str, Any]) -> str:
+        """Add the registry's tools to a client session.update that sets tools"""
+        session = message.get("session")
+        if session and "tools" in session:
+            session["tools"] = self._session_tools(session)
+        return json.dumps(message)
+    
+    def _session_tools(self, session: Optional[Dict[str, Any]]) -> list:
+        """The client's tool definitions plus the registry's, which take precedence"""
+        client_tools = [
+            tool for tool in (session or {}).get("tools") or ()
+            if not self.tool_registry.has(tool.get("name"))
+        ]
+        return client_tools + self.tool_registry.definitions()
+    
+    async def _run_tool(self, call: Dict[str, Any]):
+        """Run a tool off the event loop and hand its output to the model"""
+        try:
+            try:
+                output = await self.tool_registry.call(call["name"], call.get("arguments", ""))
+            except Exception as e:
+                # The model still needs an output, or the call never completes
+                logger.error(f"Tool {call['name']} failed: {e}")
+                output = json.dumps({"error": str(e)})
+            await self._send_upstream(json.dumps({
+                "type": "conversation.item.create",
+                "item": {"type": "function_call_output", "call_id": call.get("call_id"), "output": output}
+            }))
+        except Exception as e:
+            logger.error(f"Failed to return the output of tool {call['name']}: {e}")
+        finally:
+            self._tool_tasks.discard(asyncio.current_task())
+        await self._request_tool_response()
+    
+    async def _request_tool_response(self):
+        """Ask for the follow-up response once the calling response and all its tools are done"""
+        if self._tool_response_due and not self._tool_tasks:
+            self._tool_response_due = False
+            await self._send_upstream(json.dumps({"type": "response.create"}))
+    
+    async def _stop_for_budget(self, message_handler: Callable):
+        """Cancel any in-flight response and end the upstream session"""
+        logger.warning(f"Budget exceeded at ${self.cost_tracker.session_cost:.6f}, closing OpenAI session")
+        if self.is_connected:
+            # A server VAD turn may already have started the next response
+            await self.websocket.send(json.dumps({"type": "response.cancel"}))
+        error_msg = ErrorMessage(
+            type=MessageType.ERROR,
+            message="Budget exceeded",
+            error="The spending limit for this session has been reached"
+        )
+        await message_handler(error_msg.model_dump(), MessageType.ERROR.value)
+        await self.disconnect(intentional=True)
+    
+    async def _forward_event(self, message: str, event_type: str, message_handler: Callable):
+        """Forward an undecoded upstream frame to the client"""
+        if self.transcript and event_type in TRANSCRIPT_EVENT_TYPES:
+            self.transcript.add_event(event_type, message)
+        if self.output_reframer and event_type in OUTPUT_FLUSH_EVENT_TYPES:
+            self.output_reframer.end_response()
+        
+        if self.barge_in and event_type == MessageType.RESPONSE_AUDIO_DELTA.value:
+            if self._discard_audio:
+                # Stragglers of a response the caller talked over
+                self.barge_in_stats.discarded_deltas += 1
+                return
+            if self._first_audio_at is None:
+                self._first_audio_at = time.monotonic()
+            self._response_audio_ms += estimate_audio_ms(message)
+        
+        if event_type == MessageType.RESPONSE_AUDIO_DELTA.value and (
+            self.binary_audio or self.recorder or self.transcoder or self.output_reframer
+        ):
+            event = json.loads(message)
+            delta = event.get("delta")
+            pcm = base64.b64decode(delta) if delta else b""
+            if self.recorder and pcm:
+                self.recorder.record_output(pcm)
+            if self.output_reframer:
+                # Re-framed deltas are rebuilt around these fields when released
+                self._output_audio_fields = {
+                    key: event[key] for key in ("response_id", "item_id", "output_index", "content_index") if key in event
+                }
+                if pcm:
+                    self.output_reframer.add(pcm)
+                return
+            if self.transcoder and pcm:
+                pcm = self.transcoder.encode(pcm)
+            if self.binary_audio:
+                if pcm:
+                    await message_handler(pcm, event_type)
+                return
+            if self.transcoder:
+                event["delta"] = base64.b64encode(pcm).decode("ascii")
+                await message_handler(event, event_type)
+                return
+        
+        # Fast path: forward the original frame untouched
+        await message_handler(message, event_type)
+    
+    async def _emit_output_audio(self, pcm: bytes):
+        """Deliver a re-framed chunk of output audio in the client's format"""
+        if self.transcoder:
+            pcm = self.transcoder.encode(pcm)
+        event_type = MessageType.RESPONSE_AUDIO_DELTA.value
+        if self.binary_audio:
+            if pcm:
+                await self._message_handler(pcm, event_type)
+            return
+        event = {"type": event_type, **self._output_audio_fields, "delta": base64.b64encode(pcm).decode("ascii")}
+        await self._message_handler(json.dumps(event, separators=(",", ":")), event_type)
+    
+    async def _track_response(self, event_type: str, message: str):
+        """Follow the response being played and interrupt it on speech start"""
+        if event_type == MessageType.RESPONSE_CREATED.value:
+            self._response_active = True
+            self._audio_item_id = None
+            self._response_audio_ms = 0.0
+            self._first_audio_at = None
+            self._discard_audio = False
+            self._cancel_pending = False
+        elif event_type == "response.output_item.added":
+            if self._audio_item_id is None:
+                self._audio_item_id = json.loads(message).get("item", {}).get("id")
+        elif event_type == MessageType.RESPONSE_DONE.value:
+            self._response_active = False
+        elif event_type == MessageType.INPUT_AUDIO_BUFFER_SPEECH_STARTED.value:
+            await self._interrupt_response()
+    
+    async def _interrupt_response(self):
+        """Silence the agent: drop queued audio, then cancel and truncate upstream"""
+        if self.cancel_replay():
+            # A cached response is local; there is nothing to cancel upstream
+            self.barge_in_stats.dropped_audio_ms += self._drop_output_audio()
+            self.barge_in_stats.interruptions += 1
+            return
+        if self._first_audio_at is None:
+            return
+        # The client plays in real time from the first delta, so it keeps
+        # hearing the response after response.done until everything it was
+        # sent has played out
+        elapsed_ms = (time.monotonic() - self._first_audio_at) * 1000
+        if not self._response_active and elapsed_ms >= self._response_audio_ms:
+            return
+        
+        dropped_ms = self._drop_output_audio()
+        # It cannot have heard more than the elapsed time or the audio it was sent
+        played_ms = int(max(min(self._response_audio_ms - dropped_ms, elapsed_ms), 0))
+        generating = self._response_active
+        
+        self._response_active = False
+        self._discard_audio = True
+        # Truncate once per response
+        self._first_audio_at = None
+        self.barge_in_stats.interruptions += 1
+        self.barge_in_stats.dropped_audio_ms += dropped_ms
+        logger.info(f"Barge-in: stopping response at {played_ms}ms, dropped {dropped_ms:.0f}ms of queued audio")
+        
+        if generating:
+            self._cancel_pending = True
+            await self._send_upstream(json.dumps({"type": "response.cancel"}))
+        if self._audio_item_id:
+            await self._send_upstream(json.dumps({
+                "type": "conversation.item.truncate",
+                "item_id": self._audio_item_id,
+                "content_index": 0,
+                "audio_end_ms": played_ms
+            }))
+    
+    def _drop_output_audio(self) -> float:
+        """Discard output audio not yet sent or still queued for the client"""
+        dropped_ms = self.output_reframer.drop() if self.output_reframer else 0.0
+        if self.flush_output_audio:
+            dropped_ms += self.flush_output_audio()
+        return dropped_ms
+    
+    def _record_upstream_event(self, event_type: Optional[str], message: str):
+        """Count an upstream event and time speech end to first output audio"""
+        self.metrics.count_event("upstream", event_type or "unknown", len(message))
+        if event_type == MessageType.INPUT_AUDIO_BUFFER_SPEECH_STOPPED.value:
+            self._speech_stopped_at = time.perf_counter()
+        elif event_type == MessageType.RESPONSE_AUDIO_DELTA.value and self._speech_stopped_at is not None:
+            self.metrics.speech_to_first_audio.observe(time.perf_counter() - self._speech_stopped_at)
+            self._speech_stopped_at = None
+    
+    def _log_passthrough_event(self, message_type: Optional[str]):
+        """Log notable events that are forwarded without decoding"""
+        if message_type == "conversation.item.created":
+            logger.info("OpenAI Event: %s", message_type, extra={"event_type": message_type})
+        elif message_type == "response.created":
+            logger.info("🎯 Response Created", extra={"event_type": message_type})
+    
+    async def ping(self, timeout: float) -> bool:
+        """Check the upstream socket with a ping, closing it if no pong arrives"""
+        websocket = self.websocket
+        if websocket is None or websocket.closed:
+            return False
+        try:
+            pong_waiter = await websocket.ping()
+            await asyncio.wait_for(pong_waiter, timeout)
+            self.last_activity = time.monotonic()
+            return True
+        except (asyncio.TimeoutError, ConnectionClosed):
+            logger.warning("OpenAI connection did not answer keepalive ping")
+            # Closing ends the listener, which resumes on a new connection
+            await websocket.close()
+            return False
     
     @property
     def is_connected(self) -> bool:
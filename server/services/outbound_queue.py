@@ -0,0 +1,195 @@
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Callable, Awaitable, Deque, Tuple, Union
+
+from models.audio import BYTES_PER_MS
+from models.websocket import MessageType
+
+logger = logging.getLogger(__name__)
+
+# Approximate size of the JSON fields around the base64 payload of a raw
+# response.audio.delta frame (type, event_id, response_id, item_id, ...)
+_DELTA_ENVELOPE_CHARS = 160
+
+OutboundMessage = Union[Dict[str, Any], str, bytes]
+
+
+@dataclass
+class OutboundStats:
+    depth: int = 0
+    max_depth: int = 0
+    enqueued: int = 0
+    sent: int = 0
+    dropped_audio: int = 0
+    dropped_audio_ms: float = 0.0
+    overflows: int = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and drop counters"""
+        return {
+            "depth": self.depth,
+            "maxDepth": self.max_depth,
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "droppedAudio": self.dropped_audio,
+            "droppedAudioMs": round(self.dropped_audio_ms, 1),
+            "overflows": self.overflows
+        }
+
+
+def estimate_audio_ms(message: OutboundMessage, bytes_per_ms: float = BYTES_PER_MS) -> float:
+    """Estimate the duration of a response.audio.delta without decoding it"""
+    if isinstance(message, bytes):
+        return len(message) / bytes_per_ms
+    if isinstance(message, str):
+        base64_chars = max(len(message) - _DELTA_ENVELOPE_CHARS, 0)
+        return base64_chars * 3 / 4 / bytes_per_ms
+    return len(message.get("delta", "")) * 3 / 4 / bytes_per_ms
+
+
+class OutboundQueue:
+    """Bounded per-client send queue drained by a dedicated writer task
+
+    Control events are always kept. When the client falls more than
+    max_audio_lag_ms of audio behind, or the queue exceeds max_messages, the
+    oldest queued audio deltas are dropped so the relay never blocks on a
+    slow peer and memory per connection stays bounded. If the queue is still
+    over max_messages with no audio left to drop, the client cannot keep up
+    even with control events: the queue is discarded, closed, and on_overflow
+    is called so the connection can be ended. bytes_per_ms is the client
+    leg's audio format, which differs from upstream when transcoding.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[OutboundMessage], Awaitable[None]],
+        max_messages: int = 256,
+        max_audio_lag_ms: float = 5000,
+        bytes_per_ms: float = BYTES_PER_MS,
+        on_overflow: Optional[Callable[[], None]] = None,
+        stats: Optional[OutboundStats] = None
+    ):
+        self._send = send
+        self.max_messages = max_messages
+        self.max_audio_lag_ms = max_audio_lag_ms
+        self.bytes_per_ms = bytes_per_ms
+        self.on_overflow = on_overflow
+        self.stats = stats or OutboundStats()
+        # (message, audio duration in ms or None for control events)
+        self._queue: Deque[Tuple[OutboundMessage, Optional[float]]] = deque()
+        self._queued_audio_ms = 0.0
+        self._ready = asyncio.Event()
+        self._writer_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def start(self):
+        """Start the writer task"""
+        self._writer_task = asyncio.create_task(self._writer())
+
+    async def close(self):
+        """Stop the writer task and discard anything still queued"""
+        self._closed = True
+        if self._writer_task:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+        self.stats.depth -= len(self._queue)
+        self._queue.clear()
+        self._queued_audio_ms = 0.0
+
+    def put(self, message: OutboundMessage, event_type: Optional[str] = None):
+        """Queue a message for the client without waiting for the send"""
+        if self._closed:
+            return
+        audio_ms = None
+        if event_type == MessageType.RESPONSE_AUDIO_DELTA.value:
+            audio_ms = estimate_audio_ms(message, self.bytes_per_ms)
+            self._queued_audio_ms += audio_ms
+
+        self._queue.append((message, audio_ms))
+        self.stats.enqueued += 1
+        self.stats.depth += 1
+        if not self._trim():
+            self._overflow()
+            return
+        self.stats.max_depth = max(self.stats.max_depth, len(self._queue))
+        self._ready.set()
+
+    @property
+    def depth(self) -> int:
+        """Number of messages waiting to be sent"""
+        return len(self._queue)
+
+    @property
+    def queued_audio_ms(self) -> float:
+        """Duration of the audio waiting to be sent"""
+        return self._queued_audio_ms
+
+    def drop_audio(self) -> float:
+        """Discard all queued audio, e.g. when the caller interrupts, returning its duration"""
+        dropped_ms = self._queued_audio_ms
+        kept = deque(item for item in self._queue if item[1] is None)
+        dropped = len(self._queue) - len(kept)
+        self._queue = kept
+        self._queued_audio_ms = 0.0
+        self.stats.depth -= dropped
+        self.stats.dropped_audio += dropped
+        self.stats.dropped_audio_ms += dropped_ms
+        return dropped_ms
+    
+    def _trim(self) -> bool:
+        """Drop the oldest audio while the client is too far behind
+
+        Returns False if the queue is over max_messages with no audio left to drop.
+        """
+        while (
+            (self.max_audio_lag_ms and self._queued_audio_ms > self.max_audio_lag_ms)
+            or len(self._queue) > self.max_messages
+        ):
+            if not self._drop_oldest_audio():
+                return len(self._queue) <= self.max_messages
+        return True
+
+    def _overflow(self):
+        """Give up on a client that cannot drain even its control events"""
+        logger.warning(f"Outbound queue overflowed with {len(self._queue)} messages; closing client")
+        self.stats.overflows += 1
+        self.stats.depth -= len(self._queue)
+        self._queue.clear()
+        self._queued_audio_ms = 0.0
+        self._closed = True
+        if self._writer_task:
+            self._writer_task.cancel()
+        if self.on_overflow:
+            self.on_overflow()
+
+    def _drop_oldest_audio(self) -> bool:
+        """Remove the oldest queued audio delta, if any"""
+        for index, (_, audio_ms) in enumerate(self._queue):
+            if audio_ms is not None:
+                del self._queue[index]
+                self._queued_audio_ms -= audio_ms
+                self.stats.depth -= 1
+                self.stats.dropped_audio += 1
+                self.stats.dropped_audio_ms += audio_ms
+                return True
+        return False
+
+    async def _writer(self):
+        """Send queued messages to the client one at a time"""
+        while True:
+            if not self._queue:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+
+            message, audio_ms = self._queue.popleft()
+            self.stats.depth -= 1
+            if audio_ms is not None:
+                self._queued_audio_ms -= audio_ms
+            await self._send(message)
+            self.stats.sent += 1
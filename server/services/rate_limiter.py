@@ -0,0 +1,47 @@
+import time
+from dataclasses import dataclass
+from typing import Dict, Any
+
+
+@dataclass
+class LimiterStats:
+    rejected_sessions: int = 0
+    oversized_frames: int = 0
+    throttled_audio_frames: int = 0
+    throttled_messages: int = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get counters for client traffic turned away by the relay"""
+        return {
+            "rejectedSessions": self.rejected_sessions,
+            "oversizedFrames": self.oversized_frames,
+            "throttledAudioFrames": self.throttled_audio_frames,
+            "throttledMessages": self.throttled_messages
+        }
+
+
+class TokenBucket:
+    """Allow rate units per second on average with bursts of up to burst units
+
+    A rate of 0 disables the limit.
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "updated_at")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+
+    def consume(self, amount: float = 1.0) -> bool:
+        """Take amount tokens if available"""
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens < amount:
+            return False
+        self.tokens -= amount
+        return True
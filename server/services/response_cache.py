@@ -0,0 +1,166 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (seconds after the first audio, event type, raw upstream frame)
+Frame = Tuple[float, str, str]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    disk_hits: int = 0
+    bytes_cached: int = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the current memory footprint"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "diskHits": self.disk_hits,
+            "bytesCached": self.bytes_cached
+        }
+
+
+@dataclass
+class CachedResponse:
+    frames: List[Frame]
+    transcript: str = ""
+
+    @property
+    def size(self) -> int:
+        return sum(len(frame) for _, _, frame in self.frames)
+
+
+@dataclass
+class ResponseRecording:
+    """Upstream frames of one response, captured from response.created to response.done"""
+    key: str
+    started_at: float = field(default_factory=time.monotonic)
+    frames: List[Frame] = field(default_factory=list)
+    transcript_deltas: List[str] = field(default_factory=list)
+    transcript: Optional[str] = None
+    status: Optional[str] = None
+
+    def add(self, event_type: str, frame: str):
+        self.frames.append((time.monotonic() - self.started_at, event_type, frame))
+        if event_type == "response.audio_transcript.delta":
+            self.transcript_deltas.append(json.loads(frame).get("delta", ""))
+        elif event_type == "response.audio_transcript.done":
+            self.transcript = json.loads(frame).get("transcript")
+        elif event_type == "response.done":
+            self.status = json.loads(frame).get("response", {}).get("status")
+
+    def finish(self) -> CachedResponse:
+        """Build the replayable response, starting playback at the first audio"""
+        first_audio = next(
+            (offset for offset, event_type, _ in self.frames if event_type == "response.audio.delta"),
+            0.0
+        )
+        frames = [(max(offset - first_audio, 0.0), event_type, frame) for offset, event_type, frame in self.frames]
+        transcript = self.transcript if self.transcript is not None else "".join(self.transcript_deltas)
+        return CachedResponse(frames, transcript)
+
+
+class ResponseCache:
+    """LRU cache of complete upstream responses, bounded by stored bytes
+
+    Entries are keyed by a hash of the upstream URL, the session config
+    and the response.create request, so only responses that are fully
+    determined by those inputs (e.g. a fixed greeting) should be looked
+    up. With a directory configured, stored responses are also written to
+    disk and reloaded on a memory miss; file I/O runs on the default
+    executor.
+    """
+
+    def __init__(self, max_bytes: int, directory: Optional[str] = None, stats: Optional[CacheStats] = None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.stats = stats or CacheStats()
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(url: str, session_config: Optional[Dict[str, Any]], request: Optional[Dict[str, Any]]) -> str:
+        """Hash everything that determines the response"""
+        payload = json.dumps([url, session_config, request], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        """Look up a response in memory, then on disk"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry
+
+        if self.directory:
+            loop = asyncio.get_running_loop()
+            entry = await loop.run_in_executor(None, self._read_file, key)
+            if entry is not None:
+                self._insert(key, entry)
+                self.stats.hits += 1
+                self.stats.disk_hits += 1
+                return entry
+
+        self.stats.misses += 1
+        return None
+
+    def put(self, key: str, entry: CachedResponse):
+        """Store a response, evicting least recently used entries to fit"""
+        if entry.size > self.max_bytes:
+            return
+        self._insert(key, entry)
+        self.stats.stores += 1
+        if self.directory:
+            asyncio.get_running_loop().run_in_executor(None, self._write_file, key, entry)
+
+    def _insert(self, key: str, entry: CachedResponse):
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.stats.bytes_cached -= previous.size
+        self._entries[key] = entry
+        self.stats.bytes_cached += entry.size
+        while self.stats.bytes_cached > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.stats.bytes_cached -= evicted.size
+            self.stats.evictions += 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _read_file(self, key: str) -> Optional[CachedResponse]:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to read cached response {key}: {e}")
+            return None
+        return CachedResponse([tuple(frame) for frame in data["frames"]], data.get("transcript", ""))
+
+    def _write_file(self, key: str, entry: CachedResponse):
+        # Write then rename so concurrent readers never see a partial file
+        path = self._path(key)
+        try:
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"frames": entry.frames, "transcript": entry.transcript}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"Failed to write cached response {key}: {e}")
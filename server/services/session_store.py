@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    pid INTEGER NOT NULL,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    cost REAL NOT NULL DEFAULT 0,
+    input_tokens INTEGER NOT NULL DEFAULT 0,
+    output_tokens INTEGER NOT NULL DEFAULT 0,
+    cached_tokens INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS session_totals (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    sessions INTEGER NOT NULL DEFAULT 0,
+    cost REAL NOT NULL DEFAULT 0,
+    input_tokens INTEGER NOT NULL DEFAULT 0,
+    output_tokens INTEGER NOT NULL DEFAULT 0,
+    cached_tokens INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO session_totals (id) VALUES (0);
+"""
+
+_SUMS = (
+    "COUNT(*), COALESCE(SUM(cost), 0), COALESCE(SUM(input_tokens), 0), "
+    "COALESCE(SUM(output_tokens), 0), COALESCE(SUM(cached_tokens), 0)"
+)
+
+
+def _pid_alive(pid: int) -> bool:
+    """Check whether a worker process is still running"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SessionStore:
+    """Host-wide session accounting shared by all worker processes
+
+    Every worker writes its sessions to the same SQLite file so /health and
+    /stats report the whole host rather than whichever worker answered. All
+    database access runs on a single background thread, so writes never
+    block the event loop. Only live sessions keep a row; ended sessions are
+    folded into a single totals row, so summaries stay cheap however long
+    the host has been up.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.pid = os.getpid()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-store")
+        self._db: Optional[sqlite3.Connection] = None
+
+    async def start(self):
+        """Open the database and close out sessions left by dead workers"""
+        await self._run(self._open)
+        logger.info(f"Session store ready at {self.path}")
+
+    async def stop(self):
+        """Mark this worker's sessions ended and close the database"""
+        await self._run(self._close)
+        self._executor.shutdown(wait=True)
+
+    def session_started(self, session_id: str):
+        """Record a new live session"""
+        self._submit(
+            "INSERT OR REPLACE INTO sessions (id, pid, started_at) VALUES (?, ?, ?)",
+            (session_id, self.pid, time.time())
+        )
+
+    async def admit_session(self, session_id: str, limit: int) -> bool:
+        """Record a new live session unless the host already has limit of them"""
+        return await self._run(self._admit, session_id, limit)
+
+    def session_ended(self, session_id: str):
+        """Record that a session has finished"""
+        self._executor.submit(self._end_session, session_id)
+
+    def cost_updated(self, session_id: str, cost_data: Dict[str, Any]):
+        """Record the latest cumulative cost of a session"""
+        self._submit(
+            "UPDATE sessions SET cost = ?, input_tokens = ?, output_tokens = ?, cached_tokens = ? WHERE id = ?",
+            (
+                cost_data["total"],
+                cost_data["inputTokens"],
+                cost_data["outputTokens"],
+                cost_data["cachedTokens"],
+                session_id
+            )
+        )
+
+    async def get_summary(self) -> Dict[str, Any]:
+        """Get live session counts and cumulative cost across all workers"""
+        return await self._run(self._summarize)
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _submit(self, sql: str, params: tuple):
+        """Queue a write on the database thread without waiting for it"""
+        self._executor.submit(self._execute, sql, params)
+
+    def _execute(self, sql: str, params: tuple):
+        try:
+            self._db.execute(sql, params)
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Session store write failed: {e}")
+
+    def _admit(self, session_id: str, limit: int) -> bool:
+        try:
+            # Count and insert under one write lock so workers cannot both take the last slot
+            self._db.execute("BEGIN IMMEDIATE")
+            (active,) = self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()
+            if active >= limit:
+                # Sessions of crashed workers should not hold slots
+                self._end_orphaned_sessions()
+                (active,) = self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()
+            if active >= limit:
+                return False
+            self._db.execute(
+                "INSERT OR REPLACE INTO sessions (id, pid, started_at) VALUES (?, ?, ?)",
+                (session_id, self.pid, time.time())
+            )
+            return True
+        except sqlite3.Error as e:
+            # Admit rather than turn every caller away while the store is unavailable
+            logger.error(f"Session admission failed: {e}")
+            return True
+        finally:
+            if self._db.in_transaction:
+                self._db.commit()
+
+    def _end_session(self, session_id: str):
+        try:
+            self._end_sessions("id = ?", (session_id,))
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Session store write failed: {e}")
+
+    def _open(self):
+        self._db = sqlite3.connect(self.path, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        # Rows ended before totals were kept
+        self._end_sessions("ended_at IS NOT NULL", ())
+        self._end_orphaned_sessions()
+        self._db.commit()
+
+    def _close(self):
+        self._end_sessions("pid = ?", (self.pid,))
+        self._db.commit()
+        self._db.close()
+
+    def _end_sessions(self, where: str, params: tuple):
+        """Fold the matching sessions into the totals row and delete them
+
+        Runs in an immediate transaction so two workers ending the same
+        orphaned sessions cannot both count them. The caller commits.
+        """
+        if not self._db.in_transaction:
+            self._db.execute("BEGIN IMMEDIATE")
+        ended = self._db.execute(f"SELECT {_SUMS} FROM sessions WHERE {where}", params).fetchone()
+        if ended[0]:
+            self._db.execute(
+                "UPDATE session_totals SET sessions = sessions + ?, cost = cost + ?, input_tokens = input_tokens + ?, "
+                "output_tokens = output_tokens + ?, cached_tokens = cached_tokens + ? WHERE id = 0",
+                ended
+            )
+            self._db.execute(f"DELETE FROM sessions WHERE {where}", params)
+
+    def _end_orphaned_sessions(self):
+        """End live sessions owned by worker processes that no longer exist"""
+        rows = self._db.execute("SELECT DISTINCT pid FROM sessions").fetchall()
+        for (pid,) in rows:
+            if not _pid_alive(pid):
+                self._end_sessions("pid = ?", (pid,))
+
+    def _summarize(self) -> Dict[str, Any]:
+        # Only live sessions have rows, so this checks one PID per worker
+        self._end_orphaned_sessions()
+        self._db.commit()
+        workers, *live = self._db.execute(f"SELECT COUNT(DISTINCT pid), {_SUMS} FROM sessions").fetchone()
+        ended = self._db.execute(
+            "SELECT sessions, cost, input_tokens, output_tokens, cached_tokens FROM session_totals WHERE id = 0"
+        ).fetchone()
+        total, cost, input_tokens, output_tokens, cached_tokens = (a + b for a, b in zip(live, ended))
+        return {
+            "activeSessions": live[0],
+            "activeWorkers": workers,
+            "totalSessions": total,
+            "cost": {
+                "total": cost,
+                "inputTokens": input_tokens,
+                "outputTokens": output_tokens,
+                "cachedTokens": cached_tokens
+            }
+        }
@@ -0,0 +1,101 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Deque, List
+
+import numpy as np
+
+from models.audio import BYTES_PER_MS, BYTES_PER_SAMPLE
+
+
+@dataclass
+class SuppressionStats:
+    audio_ms_in: float = 0.0
+    audio_ms_saved: float = 0.0
+    chunks_dropped: int = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get input audio totals and how much silence was not sent upstream"""
+        return {
+            "audioSecondsIn": round(self.audio_ms_in / 1000, 2),
+            "audioSecondsSaved": round(self.audio_ms_saved / 1000, 2),
+            "chunksDropped": self.chunks_dropped
+        }
+
+
+class SilenceSuppressor:
+    """Drop runs of silence from input audio before it is sent upstream
+
+    Each chunk is split into short analysis frames whose RMS energy is
+    computed in one vectorized pass. Audio keeps flowing for hangover_ms
+    after the last voiced frame so server-side VAD still sees the trailing
+    silence it needs to end a turn; after that, silent chunks are held in
+    a pre-roll buffer of preroll_ms and released ahead of the next voiced
+    chunk so speech onsets are not clipped. Older silence is dropped.
+    """
+
+    def __init__(
+        self,
+        threshold_dbfs: float = -50.0,
+        preroll_ms: float = 300.0,
+        hangover_ms: float = 1000.0,
+        frame_ms: int = 10,
+        stats: Optional[SuppressionStats] = None
+    ):
+        self.threshold = 32768 * 10 ** (threshold_dbfs / 20)
+        self.preroll_ms = preroll_ms
+        self.hangover_ms = hangover_ms
+        self.frame_samples = frame_ms * BYTES_PER_MS // BYTES_PER_SAMPLE
+        self.frame_ms = frame_ms
+        self.stats = stats or SuppressionStats()
+        # Per-session total, also reported through SessionCostTracker
+        self.audio_ms_saved = 0.0
+        self._preroll: Deque[bytes] = deque()
+        self._preroll_ms = 0.0
+        # Start as if already silent so leading silence is suppressed
+        self._silent_ms = hangover_ms
+
+    def process(self, pcm: bytes) -> List[bytes]:
+        """Return the chunks that should be sent upstream for this input"""
+        if len(pcm) < BYTES_PER_SAMPLE:
+            return []
+        chunk_ms = len(pcm) / BYTES_PER_MS
+        self.stats.audio_ms_in += chunk_ms
+
+        voiced = self._voiced_frames(pcm)
+        if voiced.any():
+            last_voiced = len(voiced) - 1 - int(np.argmax(voiced[::-1]))
+            self._silent_ms = (len(voiced) - 1 - last_voiced) * self.frame_ms
+            chunks = list(self._preroll)
+            chunks.append(pcm)
+            self._preroll.clear()
+            self._preroll_ms = 0.0
+            return chunks
+
+        self._silent_ms += chunk_ms
+        if self._silent_ms <= self.hangover_ms:
+            return [pcm]
+
+        # Hold silence as pre-roll and drop whatever falls out of it
+        self._preroll.append(pcm)
+        self._preroll_ms += chunk_ms
+        while self._preroll and self._preroll_ms - len(self._preroll[0]) / BYTES_PER_MS >= self.preroll_ms:
+            dropped_ms = len(self._preroll.popleft()) / BYTES_PER_MS
+            self._preroll_ms -= dropped_ms
+            self.audio_ms_saved += dropped_ms
+            self.stats.audio_ms_saved += dropped_ms
+            self.stats.chunks_dropped += 1
+        return []
+
+    @property
+    def audio_seconds_saved(self) -> float:
+        """Seconds of silence this session did not send upstream"""
+        return self.audio_ms_saved / 1000
+
+    def _voiced_frames(self, pcm: bytes) -> np.ndarray:
+        """RMS energy of each analysis frame compared against the threshold"""
+        samples = np.frombuffer(pcm, dtype="<i2", count=len(pcm) // BYTES_PER_SAMPLE)
+        frame_count = max(len(samples) // self.frame_samples, 1)
+        usable = samples[:frame_count * self.frame_samples] if len(samples) >= self.frame_samples else samples
+        frames = usable.astype(np.float32).reshape(frame_count, -1)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        return rms > self.threshold
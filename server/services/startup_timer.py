@@ -0,0 +1,45 @@
+import logging
+import time
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """Break process startup into named, consecutively timed steps
+
+    started_at is the perf_counter reading taken first thing in main.py.
+    When the launcher exported its wall-clock start time (launched_at), the
+    interpreter, uvicorn and worker spawn time before main.py is reported
+    as a "launch" step.
+    """
+
+    def __init__(self, started_at: float, launched_at: Optional[float] = None):
+        self.steps: Dict[str, float] = {}
+        self._started_at = started_at
+        self._mark = started_at
+        if launched_at:
+            imported_at = time.time() - (time.perf_counter() - started_at)
+            self.steps["launch"] = round(max(imported_at - launched_at, 0) * 1000, 1)
+        self.ready = False
+
+    def mark(self, step: str):
+        """Close the current step under the given name"""
+        now = time.perf_counter()
+        self.steps[step] = round((now - self._mark) * 1000, 1)
+        self._mark = now
+
+    def finish(self):
+        """Record the last step and log the breakdown"""
+        self.mark("lifespan")
+        self.ready = True
+        breakdown = ", ".join(f"{step} {ms:.0f}ms" for step, ms in self.steps.items())
+        logger.info(f"Ready in {self.total_ms:.0f}ms ({breakdown})")
+
+    @property
+    def total_ms(self) -> float:
+        return round(sum(self.steps.values()), 1)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the startup breakdown in milliseconds"""
+        return {"ready": self.ready, "totalMs": self.total_ms, "stepsMs": dict(self.steps)}
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SupervisionStats:
+    timers: int = 0
+    fired: int = 0
+    client_heartbeats: int = 0
+    reaped_clients: int = 0
+    upstream_pings: int = 0
+    upstream_ping_failures: int = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get timer and connection supervision counters"""
+        return {
+            "timers": self.timers,
+            "fired": self.fired,
+            "clientHeartbeats": self.client_heartbeats,
+            "reapedClients": self.reaped_clients,
+            "upstreamPings": self.upstream_pings,
+            "upstreamPingFailures": self.upstream_ping_failures
+        }
+
+
+class Timer:
+    """Handle for a scheduled callback"""
+
+    __slots__ = ("callback", "rounds", "cancelled")
+
+    def __init__(self, callback: Callable[[], None], rounds: int):
+        self.callback = callback
+        self.rounds = rounds
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerWheel:
+    """Hashed timer wheel run by a single task
+
+    Timers are hashed into slots by expiry tick; each tick the task wakes
+    once and fires every due timer in the current slot, so any number of
+    connections share one sleeping task. Resolution is tick_seconds, and
+    callbacks run synchronously on the loop, so they must not block.
+    """
+
+    def __init__(self, tick_seconds: float = 1.0, slots: int = 512, stats: Optional[SupervisionStats] = None):
+        self.tick_seconds = tick_seconds
+        self.stats = stats or SupervisionStats()
+        self._slots: List[List[Timer]] = [[] for _ in range(slots)]
+        self._cursor = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> Timer:
+        """Run callback after roughly delay seconds"""
+        ticks = max(int(round(delay / self.tick_seconds)), 1)
+        rounds, offset = divmod(ticks, len(self._slots))
+        if offset == 0:
+            rounds, offset = rounds - 1, len(self._slots)
+        timer = Timer(callback, rounds)
+        self._slots[(self._cursor + offset) % len(self._slots)].append(timer)
+        self.stats.timers += 1
+        return timer
+
+    async def _run(self):
+        next_tick = time.monotonic()
+        while True:
+            next_tick += self.tick_seconds
+            await asyncio.sleep(max(next_tick - time.monotonic(), 0))
+            self._cursor = (self._cursor + 1) % len(self._slots)
+            self._advance()
+
+    def _advance(self):
+        slot = self._slots[self._cursor]
+        if not slot:
+            return
+        pending = []
+        due = []
+        for timer in slot:
+            if timer.cancelled:
+                self.stats.timers -= 1
+            elif timer.rounds > 0:
+                timer.rounds -= 1
+                pending.append(timer)
+            else:
+                due.append(timer)
+        # Swap before firing so callbacks can reschedule into this slot
+        self._slots[self._cursor] = pending
+        for timer in due:
+            self.stats.timers -= 1
+            self.stats.fired += 1
+            try:
+                timer.callback()
+            except Exception as e:
+                logger.error(f"Timer callback failed: {e}")
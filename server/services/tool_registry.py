@@ -0,0 +1,156 @@
+import asyncio
+import importlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Callable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+ToolHandler = Callable[[Dict[str, Any]], Any]
+
+
+@dataclass
+class ToolStats:
+    calls: int = 0
+    cache_hits: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    seconds: float = 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get tool call counters and time spent in handlers"""
+        executed = self.calls - self.cache_hits
+        return {
+            "calls": self.calls,
+            "cacheHits": self.cache_hits,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "avgMs": round(self.seconds / executed * 1000, 1) if executed else 0.0
+        }
+
+
+@dataclass
+class Tool:
+    name: str
+    handler: ToolHandler
+    description: str = ""
+    parameters: Dict[str, Any] = field(default_factory=lambda: {"type": "object", "properties": {}})
+    # Seconds a result may be reused for the same arguments (0 disables caching)
+    cache_ttl: float = 0.0
+
+    def definition(self) -> Dict[str, Any]:
+        """Function definition as sent in session.update"""
+        return {
+            "type": "function",
+            "name": self.name,
+            "description": self.description,
+            "parameters": self.parameters
+        }
+
+
+class ToolRegistry:
+    """Tools the relay runs itself when the model calls them
+
+    Handlers take the parsed arguments and return a JSON-serializable
+    result. They run on an executor so blocking I/O or CPU-heavy tools
+    never stall the event loop; with use_processes the handlers must be
+    module-level functions. Results of tools registered with a cache_ttl
+    are kept in an LRU cache keyed by tool name and canonical arguments.
+    Failures and timeouts are returned to the model as {"error": ...}.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        timeout: float = 10.0,
+        cache_size: int = 256,
+        use_processes: bool = False,
+        stats: Optional[ToolStats] = None
+    ):
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self.stats = stats or ToolStats()
+        self._tools: Dict[str, Tool] = {}
+        # (name, arguments) -> (expires at, output)
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[float, str]]" = OrderedDict()
+        if use_processes:
+            self._executor: Executor = ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+
+    def register(
+        self,
+        name: str,
+        handler: ToolHandler,
+        description: str = "",
+        parameters: Optional[Dict[str, Any]] = None,
+        cache_ttl: float = 0.0
+    ):
+        tool = Tool(name, handler, description, cache_ttl=cache_ttl)
+        if parameters is not None:
+            tool.parameters = parameters
+        self._tools[name] = tool
+
+    def load_modules(self, module_names: List[str]):
+        """Import modules that add their tools through a register(registry) function"""
+        for module_name in module_names:
+            importlib.import_module(module_name).register(self)
+            logger.info(f"Loaded tools from {module_name}")
+
+    def has(self, name: Optional[str]) -> bool:
+        return name in self._tools
+
+    def __len__(self) -> int:
+        return len(self._tools)
+
+    def definitions(self) -> List[Dict[str, Any]]:
+        return [tool.definition() for tool in self._tools.values()]
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+    async def call(self, name: str, arguments: str) -> str:
+        """Run a tool with the model's JSON arguments and return its output as a string"""
+        self.stats.calls += 1
+        tool = self._tools[name]
+        try:
+            parsed = json.loads(arguments or "{}")
+        except json.JSONDecodeError as e:
+            self.stats.errors += 1
+            return json.dumps({"error": f"Invalid arguments: {e}"})
+
+        key = (name, json.dumps(parsed, sort_keys=True, separators=(",", ":")))
+        if tool.cache_ttl > 0:
+            cached = self._cache.get(key)
+            if cached and cached[0] > time.monotonic():
+                self._cache.move_to_end(key)
+                self.stats.cache_hits += 1
+                return cached[1]
+
+        started_at = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            result = await asyncio.wait_for(loop.run_in_executor(self._executor, tool.handler, parsed), self.timeout)
+            # Results that cannot be serialized are reported like any other failure
+            output = result if isinstance(result, str) else json.dumps(result)
+        except asyncio.TimeoutError:
+            self.stats.timeouts += 1
+            logger.warning(f"Tool {name} timed out after {self.timeout}s")
+            return json.dumps({"error": f"Tool {name} timed out"})
+        except Exception as e:
+            self.stats.errors += 1
+            logger.error(f"Tool {name} failed: {e}")
+            return json.dumps({"error": str(e)})
+        finally:
+            self.stats.seconds += time.perf_counter() - started_at
+
+        if tool.cache_ttl > 0:
+            self._cache[key] = (time.monotonic() + tool.cache_ttl, output)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return output
@@ -0,0 +1,35 @@
+"""
+Built-in server-side tools
+
+Other modules can provide tools the same way: expose register(registry)
+and list the module in TOOL_MODULES.
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, Any
+from zoneinfo import ZoneInfo
+
+
+def get_current_time(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Current date and time, in an IANA timezone when one is given"""
+    zone = arguments.get("timezone")
+    now = datetime.now(ZoneInfo(zone) if zone else timezone.utc)
+    return {"datetime": now.isoformat(timespec="seconds"), "timezone": zone or "UTC"}
+
+
+def register(registry):
+    registry.register(
+        "get_current_time",
+        get_current_time,
+        description="Get the current date and time",
+        parameters={
+            "type": "object",
+            "properties": {
+                "timezone": {
+                    "type": "string",
+                    "description": "IANA timezone name, e.g. Europe/Paris. Defaults to UTC."
+                }
+            }
+        },
+        cache_ttl=1.0
+    )
@@ -0,0 +1,130 @@
+import asyncio
+import base64
+import gzip
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Union, Iterator
+
+logger = logging.getLogger(__name__)
+
+TRACE_VERSION = 1
+
+# Frame directions as seen from the relay
+CLIENT = "client"
+UPSTREAM = "upstream"
+
+_CLOSE = object()
+
+
+@dataclass
+class TraceStats:
+    traces: int = 0
+    events: int = 0
+    dropped_events: int = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get trace counters and events lost to a slow disk"""
+        return {
+            "traces": self.traces,
+            "events": self.events,
+            "droppedEvents": self.dropped_events
+        }
+
+
+class TraceRecorder:
+    """Record both directions of a session as gzip-compressed JSONL
+
+    The first line is a header describing the client leg; every other line
+    is one frame received by the relay with its monotonic offset from the
+    start of the trace in seconds. Binary frames are stored base64 encoded.
+    As with CallRecorder, the event loop only timestamps frames and hands
+    them to a bounded queue; encoding, compression and writes happen on a
+    background thread, and frames are dropped rather than blocking.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        session_id: str,
+        header: Optional[Dict[str, Any]] = None,
+        max_pending_events: int = 4096,
+        stats: Optional[TraceStats] = None
+    ):
+        self.path = os.path.join(directory, f"{session_id}.jsonl.gz")
+        self.session_id = session_id
+        self.stats = stats or TraceStats()
+        self.dropped_events = 0
+        self._started_at = time.monotonic()
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending_events)
+        self._queue.put_nowait({
+            "trace": TRACE_VERSION,
+            "sessionId": session_id,
+            "startedAt": time.time(),
+            **(header or {})
+        })
+        self._thread = threading.Thread(target=self._run, name=f"trace-{session_id[:8]}", daemon=True)
+        self._thread.start()
+        self.stats.traces += 1
+
+    def record_client(self, frame: Union[str, bytes]):
+        """Tap a frame received from the client"""
+        self._put(CLIENT, frame)
+
+    def record_upstream(self, frame: Union[str, bytes]):
+        """Tap a frame received from OpenAI"""
+        self._put(UPSTREAM, frame)
+
+    async def close(self):
+        """Flush the trace without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._finish)
+        if self.dropped_events:
+            logger.warning(f"Trace {self.session_id} dropped {self.dropped_events} events")
+
+    def _put(self, direction: str, frame: Union[str, bytes]):
+        try:
+            self._queue.put_nowait((time.monotonic() - self._started_at, direction, frame))
+            self.stats.events += 1
+        except queue.Full:
+            self.dropped_events += 1
+            self.stats.dropped_events += 1
+
+    def _finish(self):
+        self._queue.put(_CLOSE)
+        self._thread.join()
+
+    def _run(self):
+        """Writer thread: encode queued frames and append them to the trace"""
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with gzip.open(self.path, "wt", encoding="utf-8", compresslevel=6) as trace:
+                trace.write(json.dumps(self._queue.get()) + "\n")
+                while True:
+                    item = self._queue.get()
+                    if item is _CLOSE:
+                        break
+                    offset, direction, frame = item
+                    record = {"t": round(offset, 6), "dir": direction}
+                    if isinstance(frame, bytes):
+                        record["bytes"] = base64.b64encode(frame).decode("ascii")
+                    else:
+                        record["text"] = frame
+                    trace.write(json.dumps(record) + "\n")
+        except Exception as e:
+            logger.error(f"Trace {self.session_id} failed: {e}")
+            # Keep draining so close() still returns
+            while self._queue.get() is not _CLOSE:
+                pass
+
+
+def read_trace(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the header and then every recorded frame of a trace"""
+    with gzip.open(path, "rt", encoding="utf-8") as trace:
+        for line in trace:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,226 @@
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Set, Deque
+
+logger = logging.getLogger(__name__)
+
+# Upstream events carrying transcript text, mapped to the speaker's role
+TRANSCRIPT_DELTA_EVENTS = {
+    "conversation.item.input_audio_transcription.delta": "user",
+    "response.audio_transcript.delta": "assistant",
+    "response.text.delta": "assistant",
+}
+TRANSCRIPT_DONE_EVENTS = {
+    "conversation.item.input_audio_transcription.completed": ("user", "transcript"),
+    "response.audio_transcript.done": ("assistant", "transcript"),
+    "response.text.done": ("assistant", "text"),
+}
+TRANSCRIPT_EVENT_TYPES = frozenset(TRANSCRIPT_DELTA_EVENTS) | frozenset(TRANSCRIPT_DONE_EVENTS)
+
+
+@dataclass
+class TranscriptStats:
+    sessions: int = 0
+    observers: int = 0
+    published: int = 0
+    resyncs: int = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get live transcript and observer counters"""
+        return {
+            "sessions": self.sessions,
+            "observers": self.observers,
+            "published": self.published,
+            "resyncs": self.resyncs
+        }
+
+
+@dataclass
+class TranscriptEntry:
+    """One utterance, kept as the list of deltas received so far
+
+    Deltas are only joined when the text is read; once the final
+    transcript arrives the chunks collapse into that single string.
+    """
+    item_id: str
+    role: str
+    chunks: List[str] = field(default_factory=list)
+    done: bool = False
+
+    @property
+    def text(self) -> str:
+        if len(self.chunks) > 1:
+            self.chunks = ["".join(self.chunks)]
+        return self.chunks[0] if self.chunks else ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"itemId": self.item_id, "role": self.role, "text": self.text, "done": self.done}
+
+
+class TranscriptObserver:
+    """Bounded event queue of one supervisor watching a session
+
+    A full queue is never waited on: the backlog is discarded and the
+    observer is flagged to receive a fresh snapshot instead, so a slow
+    observer costs the relay nothing and still ends up consistent.
+    """
+
+    def __init__(self, max_events: int):
+        self.max_events = max_events
+        self.needs_snapshot = True
+        self.closed = False
+        self._events: Deque[Dict[str, Any]] = deque()
+        self._ready = asyncio.Event()
+
+    def put(self, event: Dict[str, Any]) -> bool:
+        """Queue an event, returning False when the observer had to resync"""
+        if self.needs_snapshot:
+            return True  # The snapshot it is waiting for already includes this
+        if len(self._events) >= self.max_events:
+            self._events.clear()
+            self.needs_snapshot = True
+            self._ready.set()
+            return False
+        self._events.append(event)
+        self._ready.set()
+        return True
+
+    def close(self):
+        self.closed = True
+        self._ready.set()
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until there is something to send, returning False on timeout"""
+        if self._events or self.needs_snapshot or self.closed:
+            return True
+        self._ready.clear()
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def drain(self) -> List[Dict[str, Any]]:
+        events = list(self._events)
+        self._events.clear()
+        return events
+
+
+class SessionTranscript:
+    """Incrementally assembled transcript of one live session"""
+
+    def __init__(self, hub: "TranscriptHub", session_id: str, tenant: str):
+        self.hub = hub
+        self.session_id = session_id
+        self.tenant = tenant
+        self.started_at = time.time()
+        self.entries: Dict[str, TranscriptEntry] = {}
+
+    def add_event(self, event_type: str, message: str):
+        """Fold an upstream transcript event into the transcript and publish it"""
+        event = json.loads(message)
+        item_id = event.get("item_id") or event.get("response_id") or ""
+        if event_type in TRANSCRIPT_DELTA_EVENTS:
+            delta = event.get("delta")
+            if not delta:
+                return
+            entry = self._entry(item_id, TRANSCRIPT_DELTA_EVENTS[event_type])
+            entry.chunks.append(delta)
+            update = {"type": "transcript.delta", "itemId": item_id, "role": entry.role, "delta": delta}
+        else:
+            role, key = TRANSCRIPT_DONE_EVENTS[event_type]
+            entry = self._entry(item_id, role)
+            text = event.get(key)
+            if text is not None:
+                entry.chunks = [text]
+            entry.done = True
+            update = {"type": "transcript.done", "itemId": item_id, "role": role, "text": entry.text}
+        self.hub.publish(self.session_id, update)
+
+    def _entry(self, item_id: str, role: str) -> TranscriptEntry:
+        entry = self.entries.get(item_id)
+        if entry is None:
+            entry = self.entries[item_id] = TranscriptEntry(item_id, role)
+        return entry
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "type": "transcript.snapshot",
+            "sessionId": self.session_id,
+            "tenant": self.tenant,
+            "startedAt": self.started_at,
+            "entries": [entry.to_dict() for entry in self.entries.values()]
+        }
+
+
+class TranscriptHub:
+    """Per-worker registry of live transcripts and the observers watching them
+
+    Publishing only appends to in-memory queues, so it is safe to call from
+    the relay's upstream reader without awaiting anything.
+    """
+
+    def __init__(self, observer_queue_size: int = 256, stats: Optional[TranscriptStats] = None):
+        self.observer_queue_size = observer_queue_size
+        self.stats = stats or TranscriptStats()
+        self._sessions: Dict[str, SessionTranscript] = {}
+        self._observers: Dict[str, Set[TranscriptObserver]] = {}
+
+    def open(self, session_id: str, tenant: str) -> SessionTranscript:
+        transcript = SessionTranscript(self, session_id, tenant)
+        self._sessions[session_id] = transcript
+        self.stats.sessions = len(self._sessions)
+        return transcript
+
+    def close(self, session_id: str):
+        """Forget a finished session and end its observers' streams"""
+        self._sessions.pop(session_id, None)
+        self.stats.sessions = len(self._sessions)
+        for observer in self._observers.pop(session_id, ()):
+            observer.close()
+
+    def get(self, session_id: str) -> Optional[SessionTranscript]:
+        return self._sessions.get(session_id)
+
+    def list_sessions(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "sessionId": transcript.session_id,
+                "tenant": transcript.tenant,
+                "startedAt": transcript.started_at,
+                "entries": len(transcript.entries),
+                "observers": len(self._observers.get(transcript.session_id, ()))
+            }
+            for transcript in self._sessions.values()
+        ]
+
+    def subscribe(self, session_id: str) -> Optional[TranscriptObserver]:
+        if session_id not in self._sessions:
+            return None
+        observer = TranscriptObserver(self.observer_queue_size)
+        self._observers.setdefault(session_id, set()).add(observer)
+        self.stats.observers += 1
+        return observer
+
+    def unsubscribe(self, session_id: str, observer: TranscriptObserver):
+        observers = self._observers.get(session_id)
+        if observers is not None:
+            observers.discard(observer)
+            if not observers:
+                del self._observers[session_id]
+        self.stats.observers -= 1
+
+    def publish(self, session_id: str, event: Dict[str, Any]):
+        """Fan an update out to the session's observers without blocking"""
+        observers = self._observers.get(session_id)
+        if not observers:
+            return
+        self.stats.published += 1
+        for observer in observers:
+            if not observer.put(event):
+                self.stats.resyncs += 1
+                logger.warning(f"Transcript observer of session {session_id} fell behind, resyncing")
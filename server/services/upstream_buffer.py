@@ -0,0 +1,85 @@
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Deque, Tuple, List
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ResumeStats:
+    reconnects: int = 0
+    failed_reconnects: int = 0
+    dropped_audio_ms: float = 0.0
+    dropped_messages: int = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get upstream resumption counters and what the outages cost"""
+        return {
+            "reconnects": self.reconnects,
+            "failedReconnects": self.failed_reconnects,
+            "droppedAudioMs": round(self.dropped_audio_ms, 1),
+            "droppedMessages": self.dropped_messages
+        }
+
+
+class UpstreamBuffer:
+    """Ring buffer for upstream frames sent while the OpenAI socket is down
+
+    Input audio is capped by duration: once more than max_audio_ms is held,
+    the oldest audio is discarded so a resumed call continues from recent
+    speech instead of replaying a long backlog. Control messages are kept
+    unless more than max_messages are pending.
+    """
+
+    def __init__(self, max_audio_ms: float = 2000.0, max_messages: int = 64, stats: Optional[ResumeStats] = None):
+        self.max_audio_ms = max_audio_ms
+        self.max_messages = max_messages
+        self.stats = stats or ResumeStats()
+        # (frame, audio ms or None for control messages)
+        self._frames: Deque[Tuple[str, Optional[float]]] = deque()
+        self._audio_ms = 0.0
+        self._messages = 0
+
+    def put(self, message: str, audio_ms: Optional[float] = None):
+        """Hold a frame until the connection is back"""
+        self._frames.append((message, audio_ms))
+        if audio_ms is None:
+            self._messages += 1
+            if self._messages > self.max_messages:
+                self._drop_oldest(audio=False)
+        else:
+            self._audio_ms += audio_ms
+            while self._audio_ms > self.max_audio_ms:
+                self._drop_oldest(audio=True)
+
+    def drain(self) -> List[str]:
+        """Take every held frame in the order it was sent"""
+        frames = [message for message, _ in self._frames]
+        self._frames.clear()
+        self._audio_ms = 0.0
+        self._messages = 0
+        return frames
+
+    def clear(self):
+        self.drain()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    @property
+    def audio_ms(self) -> float:
+        return self._audio_ms
+
+    def _drop_oldest(self, audio: bool):
+        for index, (_, audio_ms) in enumerate(self._frames):
+            if (audio_ms is not None) == audio:
+                del self._frames[index]
+                if audio:
+                    self._audio_ms -= audio_ms
+                    self.stats.dropped_audio_ms += audio_ms
+                else:
+                    self._messages -= 1
+                    self.stats.dropped_messages += 1
+                    logger.warning("Upstream buffer full, dropped a queued control message")
+                return
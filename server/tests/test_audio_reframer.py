@@ -0,0 +1,74 @@
+import asyncio
+
+from models.audio import BYTES_PER_MS
+from services.audio_reframer import AudioReframer
+from services.outbound_queue import OutboundQueue, OutboundStats
+
+
+def test_ended_response_keeps_pacing_through_the_outbound_queue():
+    """Audio held past the lag limit at response end is paced out, not trimmed"""
+
+    async def run():
+        received = []
+
+        async def send(message):
+            received.append(message)
+
+        stats = OutboundStats()
+        queue = OutboundQueue(send, max_audio_lag_ms=200, stats=stats)
+        queue.start()
+
+        async def emit(pcm):
+            queue.put(pcm, "response.audio.delta")
+
+        reframer = AudioReframer(emit, frame_ms=20, min_lead_ms=40, max_lead_ms=40)
+        # Upstream delivers 600 ms at once, then ends the response
+        reframer.add(bytes(600 * BYTES_PER_MS + 10 * BYTES_PER_MS))
+        reframer.end_response()
+        assert reframer.holding
+
+        async def done():
+            queue.put("response.done", "response.done")
+
+        reframer.hold(done)
+
+        for _ in range(200):
+            await asyncio.sleep(0.01)
+            if "response.done" in received:
+                break
+        await queue.close()
+        return received, stats
+
+    received, stats = asyncio.run(run())
+    audio = [frame for frame in received if isinstance(frame, bytes)]
+    assert stats.dropped_audio == 0
+    assert received[-1] == "response.done"
+    assert sum(len(frame) for frame in audio) == 610 * BYTES_PER_MS
+    # Whole frames, then the partial tail
+    assert {len(frame) for frame in audio[:-1]} == {20 * BYTES_PER_MS}
+    assert len(audio[-1]) == 10 * BYTES_PER_MS
+
+
+def test_drop_releases_held_events():
+    async def run():
+        sent = []
+
+        async def emit(pcm):
+            sent.append(pcm)
+
+        reframer = AudioReframer(emit, frame_ms=20, min_lead_ms=40, max_lead_ms=40)
+        reframer.add(bytes(1000 * BYTES_PER_MS))
+        reframer.end_response()
+
+        async def deliver():
+            sent.append("response.done")
+
+        reframer.hold(deliver)
+        await asyncio.sleep(0.01)
+        reframer.drop()
+        await asyncio.sleep(0.01)
+        return sent, reframer.holding
+
+    sent, holding = asyncio.run(run())
+    assert sent[-1] == "response.done"
+    assert not holding
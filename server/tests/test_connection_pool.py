@@ -0,0 +1,37 @@
+import asyncio
+
+from services.connection_pool import RealtimeConnectionPool
+
+
+class FakeSocket:
+    def __init__(self, answers: bool):
+        self.answers = answers
+        self.closed = False
+
+    async def ping(self):
+        waiter = asyncio.get_running_loop().create_future()
+        if self.answers:
+            waiter.set_result(None)
+        return waiter
+
+    async def close(self):
+        self.closed = True
+
+
+def test_zero_refill_rate_removes_the_limit():
+    pool = RealtimeConnectionPool("key", 1, refill_per_second=0)
+    assert pool.refill_interval == 0.0
+
+
+def test_idle_members_that_miss_a_pong_are_dropped():
+    async def scenario():
+        pool = RealtimeConnectionPool("key", 2, ping_timeout=0.05)
+        healthy, half_open = FakeSocket(True), FakeSocket(False)
+        pool._idle.extend([(healthy, 0.0), (half_open, 0.0)])
+        await pool._ping_idle()
+        return pool, healthy, half_open
+
+    pool, healthy, half_open = asyncio.run(scenario())
+    assert [websocket for websocket, _ in pool._idle] == [healthy]
+    assert half_open.closed
+    assert pool.stats.ping_failures == 1
@@ -0,0 +1,27 @@
+import asyncio
+import base64
+import json
+
+from services.openai_relay import OpenAIRelay
+
+
+def test_event_with_type_not_first_goes_through_every_stage():
+    """Frames the fast path cannot classify are decoded, not skipped"""
+    received = []
+
+    async def handler(message, event_type=None):
+        received.append((message, event_type))
+
+    async def run():
+        relay = OpenAIRelay(api_key="test", binary_audio=True, resume_attempts=1)
+        pcm = bytes(range(64))
+        delta = {"response_id": "r1", "delta": base64.b64encode(pcm).decode("ascii"), "type": "response.audio.delta"}
+        transcript = {"event_id": "e1", "transcript": "hello", "type": "response.audio_transcript.done"}
+        await relay._handle_upstream_frame(json.dumps(delta), handler)
+        await relay._handle_upstream_frame(json.dumps(transcript), handler)
+        return relay, pcm
+
+    relay, pcm = asyncio.run(run())
+    assert received[0] == (pcm, "response.audio.delta")
+    assert received[1][1] == "response.audio_transcript.done"
+    assert list(relay.history)[-1]["content"][0]["text"] == "hello"
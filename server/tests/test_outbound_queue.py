@@ -0,0 +1,29 @@
+import asyncio
+
+from models.websocket import MessageType
+from services.outbound_queue import OutboundQueue
+
+
+def test_client_that_cannot_drain_control_events_is_closed():
+    async def scenario():
+        sent, overflows = [], []
+
+        async def send(message):
+            sent.append(message)
+
+        queue = OutboundQueue(send, max_messages=4, on_overflow=lambda: overflows.append(True))
+        audio = {"type": MessageType.RESPONSE_AUDIO_DELTA.value, "delta": "AAAA"}
+        queue.put(audio, MessageType.RESPONSE_AUDIO_DELTA.value)
+        # Audio goes first, then the queue gives up on the client
+        for index in range(5):
+            queue.put({"type": "response.audio_transcript.delta", "delta": str(index)})
+        queue.put({"type": "response.audio_transcript.delta", "delta": "late"})
+        return queue, sent, overflows
+
+    queue, sent, overflows = asyncio.run(scenario())
+    assert overflows == [True]
+    assert queue.depth == 0
+    assert queue.stats.dropped_audio == 1
+    assert queue.stats.overflows == 1
+    assert queue.stats.depth == 0
+    assert sent == []
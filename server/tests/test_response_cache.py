@@ -0,0 +1,45 @@
+import asyncio
+import json
+
+from services.openai_relay import OpenAIRelay
+from services.response_cache import ResponseCache
+
+
+async def _ignore(message, event_type=None):
+    pass
+
+
+def _relay() -> OpenAIRelay:
+    relay = OpenAIRelay(api_key="test", response_cache=ResponseCache(1 << 20))
+    relay._message_handler = _ignore
+    return relay
+
+
+def _cache_key(updates) -> str:
+    relay = _relay()
+    for session in updates:
+        relay.note_client_event("session.update", {"type": "session.update", "session": session})
+    return relay.response_cache.key(relay.url, relay._session_config, None)
+
+
+def test_cache_key_covers_every_session_update():
+    assert _cache_key([{"instructions": "A"}, {"voice": "verse"}]) != _cache_key([{"instructions": "B"}, {"voice": "verse"}])
+
+
+def test_context_before_response_created_is_not_cached_as_the_greeting():
+    async def run():
+        relay = _relay()
+        request = {"type": "response.create"}
+        await relay.create_response(json.dumps(request), request)
+        assert relay._pending_cache_key is not None
+
+        # The client adds context before the response has started upstream
+        item = {"type": "message", "role": "user", "content": [{"type": "input_text", "text": "hi"}]}
+        relay.note_client_event("conversation.item.create", {"type": "conversation.item.create", "item": item})
+        for event in ({"type": "response.created"}, {"type": "response.done", "response": {"status": "completed"}}):
+            relay._capture_for_cache(event["type"], json.dumps(event))
+        return relay
+
+    relay = asyncio.run(run())
+    assert relay._pending_cache_key is None
+    assert relay.response_cache.stats.stores == 0
@@ -0,0 +1,16 @@
+import asyncio
+import json
+from datetime import datetime
+
+from services.tool_registry import ToolRegistry
+
+
+def test_unserializable_result_is_returned_as_an_error():
+    registry = ToolRegistry(max_workers=1)
+    registry.register("now", lambda arguments: {"now": datetime(2024, 1, 1)})
+    try:
+        output = asyncio.run(registry.call("now", "{}"))
+    finally:
+        registry.shutdown()
+    assert "error" in json.loads(output)
+    assert registry.stats.errors == 1